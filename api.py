@@ -5,11 +5,14 @@ from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
 import uvicorn
 import uuid
+import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
-from agents import SQLiteSession
 
 # Import from main_agents
-from main_agents import process_user_request, active_sessions, progress_store, ProgressUpdate
+from main_agents import process_user_request, active_sessions, progress_store, last_scrape_results, ProgressUpdate, TunedSQLiteSession, configure_logging, close_http_clients, forget_session_classifications, flush_history_writes
+
+logger = logging.getLogger(__name__)
 
 # FastAPI request/response models
 class ChatRequest(BaseModel):
@@ -22,8 +25,15 @@ class ChatResponse(BaseModel):
     request_type: str
     timestamp: str
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Persist deferred conversation writes, then release pooled keep-alive connections
+    await flush_history_writes()
+    await close_http_clients()
+
 # Create FastAPI app
-app = FastAPI(title="Multi-Agent Chat API", version="1.0.0")
+app = FastAPI(title="Multi-Agent Chat API", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -41,23 +51,23 @@ async def chat_endpoint(request: ChatRequest):
         # Generate session ID if not provided
         if not request.session_id:
             request.session_id = str(uuid.uuid4())
-            print(f"🆔 Generated new session ID: {request.session_id}")
+            logger.debug("🆔 Generated new session ID: %s", request.session_id)
         else:
-            print(f"🆔 Using existing session ID: {request.session_id}")
+            logger.debug("🆔 Using existing session ID: %s", request.session_id)
         
         # Get or create session
         if request.session_id not in active_sessions:
-            print(f"🆕 Creating new session: {request.session_id}")
-            active_sessions[request.session_id] = SQLiteSession(
+            logger.info("🆕 Creating new session: %s", request.session_id)
+            active_sessions[request.session_id] = TunedSQLiteSession(
                 request.session_id, 
                 "chat_sessions.db"
             )
         else:
-            print(f"🔗 Using existing session: {request.session_id}")
+            logger.debug("🔗 Using existing session: %s", request.session_id)
         
         session = active_sessions[request.session_id]
         
-        print(f"💬 Processing message: '{request.message}' for session: {request.session_id}")
+        logger.info("💬 Processing message: '%s' for session: %s", request.message, request.session_id)
         
         # Process the request
         result = await process_user_request(request.message, session)
@@ -78,11 +88,8 @@ async def chat_endpoint(request: ChatRequest):
 @app.get("/progress/{session_id}", response_model=ProgressUpdate)
 async def get_progress(session_id: str):
     """Get current progress for a session"""
-    print(f"📡 Progress request for session: {session_id}")
-    print(f"📊 Available sessions in progress_store: {list(progress_store.keys())}")
     
     if session_id not in progress_store:
-        print(f"⚠️ Session {session_id} not found in progress_store")
         # Create initial waiting state and store it
         waiting_progress = ProgressUpdate(
             step="waiting",
@@ -91,12 +98,10 @@ async def get_progress(session_id: str):
             completed=False
         )
         progress_store[session_id] = waiting_progress
-        print(f"📤 Created waiting progress for session: {session_id}")
         return waiting_progress
     
     current_progress = progress_store[session_id]
-    print(f"✅ Returning progress: {current_progress.step} - {current_progress.description}")
-    print(f"📤 Sent to frontend: {current_progress.step} | {current_progress.description}")
+    logger.debug("📤 Progress for %s: %s - %s", session_id, current_progress.step, current_progress.description)
     return current_progress
 
 @app.get("/sessions/{session_id}/history")
@@ -107,6 +112,7 @@ async def get_session_history(session_id: str):
             return {"history": [], "session_id": session_id}
         
         session = active_sessions[session_id]
+        await flush_history_writes(session_id)
         items = await session.get_items()
         
         return {
@@ -123,8 +129,11 @@ async def clear_session(session_id: str):
     try:
         if session_id in active_sessions:
             session = active_sessions[session_id]
+            await flush_history_writes(session_id)
             await session.clear_session()
             del active_sessions[session_id]
+        last_scrape_results.pop(session_id, None)
+        forget_session_classifications(session_id)
         
         return {"message": f"Session {session_id} cleared successfully"}
         
@@ -154,5 +163,6 @@ async def serve_diagnostic_page():
     return HTMLResponse(content=html_content)
 
 if __name__ == "__main__":
+    configure_logging()
     print("🚀 Starting FastAPI server...")
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
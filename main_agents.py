@@ -1,30 +1,90 @@
-from agents import Agent, InputGuardrail, GuardrailFunctionOutput, Runner, OpenAIResponsesModel, ModelSettings, SQLiteSession
+from agents import Agent, InputGuardrail, GuardrailFunctionOutput, Runner, OpenAIResponsesModel, ModelSettings, SQLiteSession, set_default_openai_client
 from agents.exceptions import InputGuardrailTripwireTriggered
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import asyncio
-import requests
-from bs4 import BeautifulSoup
+import atexit
+import concurrent.futures
+import contextlib
+import functools
+import hashlib
+import itertools
+import logging
+import logging.handlers
+import queue
+import httpx
+from selectolax.lexbor import LexborHTMLParser
 import json
-import uuid
+import orjson
 from datetime import datetime
-from openai import OpenAI
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
 import os
 import re
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+import reprlib
+import sqlite3
+import string
+import threading
+import weakref
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
 from selenium import webdriver
-from langchain_core.output_parsers import JsonOutputParser
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from cachetools import LRUCache, TTLCache
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Background thread that writes queued log records (see configure_logging)
+_log_listener = None
+# Third-party loggers kept at WARNING whatever LOG_LEVEL says
+_QUIET_LOGGERS = ("httpx", "httpcore", "openai", "hpack")
+
+def configure_logging(level: Optional[str] = None):
+    """
+    Send log records through a QueueHandler so the stream write runs on a
+    listener thread rather than the event loop (the message itself is still
+    formatted by the caller in QueueHandler.prepare). Level defaults to
+    LOG_LEVEL and applies to the app; chatty HTTP client libraries stay at
+    WARNING. Calling it again is a no-op.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    root_logger = logging.getLogger()
+    root_logger.setLevel((level or os.getenv("LOG_LEVEL", "INFO")).upper())
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    # httpx/httpcore/openai log every request at INFO, which would flood the queue
+    for name in _QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+    _log_listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
 # Initialize OpenAI client
 openai_api_key = os.getenv("OAI_API_KEY") or os.getenv("OPENAI_API_KEY")
 if not openai_api_key:
     raise ValueError("❌ OpenAI API key not found! Please set OAI_API_KEY environment variable")
 
-client = OpenAI(api_key=openai_api_key)
-print("✅ OpenAI client initialized successfully")
+# Async client on a shared HTTP/2 connection pool, so parallel link searches
+# multiplex over a few kept-alive connections instead of blocking the loop
+client = AsyncOpenAI(
+    api_key=openai_api_key,
+    max_retries=3,  # exponential backoff on 429 / 5xx / timeouts
+    timeout=120,  # web-search completions are slow, but not ten-minutes slow
+    http_client=httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    ),
+)
+# Agent runs (classifier, Q&A, link analyzer) share the same pool instead of
+# the SDK lazily building a second client
+set_default_openai_client(client)
+logger.debug("✅ OpenAI client initialized successfully")
 
 class RequestClassification(BaseModel):
     request_type: str  # "regular_question" or "scrape_data"
@@ -62,20 +122,399 @@ class ProgressUpdate(BaseModel):
     session_id: str
     completed: bool = False
 
+# Applied once to every SQLite connection a TunedSQLiteSession opens. The SDK
+# already switches file databases to WAL; these make WAL commits cheap.
+_SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-64000",      # 64MB page cache
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",    # 256MB memory-mapped reads
+    "PRAGMA busy_timeout=10000",
+)
+
+# Stored messages larger than this are ignored when looking up scraped-data context
+_MAX_CONTEXT_ITEM_CHARS = 200_000
+
+class TunedSQLiteSession(SQLiteSession):
+    """SQLiteSession whose connections get the _SQLITE_PRAGMAS tuning on first use"""
+    
+    def __init__(self, session_id: str, db_path: str = ":memory:", **kwargs):
+        if str(db_path) != ":memory:":
+            # Only takes effect on a brand-new file, i.e. before the SDK creates its
+            # tables; lets clear_session hand freed pages back to the filesystem
+            with contextlib.closing(sqlite3.connect(str(db_path))) as conn:
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        super().__init__(session_id, db_path, **kwargs)
+        # The SDK keeps one connection per thread, so track tuning per thread too
+        self._tuned = threading.local()
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        conn = super()._get_connection()
+        if not getattr(self._tuned, "done", False):
+            try:
+                for pragma in _SQLITE_PRAGMAS:
+                    conn.execute(pragma)
+            except sqlite3.OperationalError as e:
+                # e.g. a shared connection caught mid-transaction; tuning is best-effort
+                logger.debug("⚠️ Skipped SQLite tuning: %s", e)
+            self._tuned.done = True
+        return conn
+    
+    async def clear_session(self) -> None:
+        await super().clear_session()
+        if str(self.db_path) != ":memory:":
+            def _vacuum():
+                # execute() steps the pragma once, freeing a single page; executescript()
+                # runs it to completion. The session lock keeps it clear of SDK writes.
+                conn = self._get_connection()
+                with self._lock:
+                    conn.executescript("PRAGMA incremental_vacuum;")
+            await asyncio.to_thread(_vacuum)
+    
+    async def get_latest_item_containing(self, marker: str) -> Optional[Dict]:
+        """
+        Newest assistant item in this session whose stored JSON contains
+        `marker`. The filter runs inside SQLite, so older history never reaches
+        Python. User messages that merely quote the marker are skipped. If the
+        newest match is pathologically large it is not loaded and None is
+        returned; an older, smaller match would be stale data.
+        """
+        def _query():
+            row = self._get_connection().execute(
+                # The size cap is applied to the selected row, not in WHERE, so it
+                # can't make an older match win
+                f"SELECT CASE WHEN length(message_data) < ? THEN message_data END "
+                f"FROM {self.messages_table} "
+                "WHERE session_id = ? AND instr(message_data, ?) > 0 "
+                "AND json_extract(message_data, '$.role') = 'assistant' "
+                "ORDER BY id DESC LIMIT 1",
+                (_MAX_CONTEXT_ITEM_CHARS, self.session_id, marker),
+            ).fetchone()
+            if row is None or row[0] is None:
+                return None
+            try:
+                return orjson.loads(row[0])
+            except orjson.JSONDecodeError:
+                return None
+        
+        return await asyncio.to_thread(_query)
+
 # Store active sessions and their progress
 active_sessions = {}
-progress_store = {}  # Store progress updates by session_id
+progress_store = LRUCache(maxsize=1024)  # Latest progress update by session_id; idle sessions age out
+last_scrape_results = LRUCache(maxsize=256)  # JSON-encoded results of the latest scrape by session_id; older sessions fall back to the history lookup
+
+# History writes that finished requests handed off to the background, by session_id
+_pending_history_writes: Dict[str, asyncio.Task] = {}
+
+def _write_history_later(session: SQLiteSession, items: List[Dict[str, Any]]):
+    """
+    Append `items` to the session on a background task so the response isn't held
+    up by the SQLite write. Writes for one session stay ordered; callers that read
+    the history must await flush_history_writes() first.
+    """
+    session_id = session.session_id
+    previous = _pending_history_writes.get(session_id)
+    
+    async def write():
+        if previous is not None:
+            await previous
+        try:
+            await session.add_items(items)
+        except Exception as e:
+            logger.error("❌ Failed to store conversation items for session %s: %s", session_id, e)
+    
+    task = asyncio.create_task(write())
+    _pending_history_writes[session_id] = task
+    task.add_done_callback(
+        lambda t: _pending_history_writes.pop(session_id, None) if _pending_history_writes.get(session_id) is t else None
+    )
+
+async def flush_history_writes(session_id: Optional[str] = None):
+    """Wait for the pending history writes of one session, or of all sessions"""
+    if session_id is not None:
+        task = _pending_history_writes.get(session_id)
+        if task is not None:
+            await task
+    elif _pending_history_writes:
+        await asyncio.gather(*list(_pending_history_writes.values()))
+
+# How many recent conversation items to scan for previously scraped data
+_CONTEXT_ITEMS_LIMIT = 20
+
+# Marker that precedes the results JSON in a stored scrape response
+_EXTRACTED_DATA_MARKER = "**Extracted Data:**"
+
+# Reused for raw_decode() when a JSON value is followed by other text
+_json_decoder = json.JSONDecoder()
+
+def _decode_first_json_object(text: str):
+    """Decode the first JSON object embedded in `text` (linear, no regex), or return None"""
+    start = text.find('{')
+    if start == -1:
+        return None
+    try:
+        obj, _ = _json_decoder.raw_decode(text, start)
+    except json.JSONDecodeError:
+        return None
+    return obj
+
+def _dumps(obj, *, indent: bool = False) -> str:
+    """orjson.dumps() decoded to str, optionally pretty-printed with two-space indentation"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
+def _maybe_list(text: Optional[str]):
+    """
+    Parse a results string, skipping the parser for the common trivial shapes:
+    blank/"[]" -> [], anything not starting like JSON -> None. Otherwise returns
+    orjson.loads(text), which may still raise JSONDecodeError.
+    """
+    text = text.strip() if text else ""
+    if not text or text == "[]":
+        return []
+    if text[0] not in "[{":
+        return None
+    return orjson.loads(text)
+
+# Max concurrent headless Chrome pages (each one is memory-heavy)
+_SELENIUM_MAX_BROWSERS = 2
+
+# Dedicated threads for Selenium fetches: caps concurrent browsers and keeps slow
+# renders from tying up the default executor used by asyncio.to_thread
+_selenium_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=_SELENIUM_MAX_BROWSERS, thread_name_prefix="selenium"
+)
+
+# Idle Chrome drivers kept warm between Selenium fallbacks, as (driver, page loads so far)
+_driver_pool = queue.Queue(maxsize=_SELENIUM_MAX_BROWSERS)
+
+# Page loads after which a pooled driver is quit instead of reused
+_DRIVER_MAX_USES = 50
+
+_FETCH_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; MyScraper/1.0; +https://yourdomain.com/bot)"
+}
+
+# Shared page-fetch client: keeps TCP/TLS connections alive between scrapes
+# and retries connection failures twice before we fall back to Selenium
+_http_client = httpx.AsyncClient(
+    headers=_FETCH_HEADERS,
+    timeout=30,
+    follow_redirects=True,
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,  # set on the transport: a custom transport ignores the client's http2 flag
+        retries=2,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    ),
+)
+
+# Recently fetched page HTML by URL, plus validators for conditional re-fetches
+_html_cache = TTLCache(maxsize=128, ttl=300)
+# Validators keep a copy of the body to serve 304s, so they share the HTML cache's size budget
+_html_validators = LRUCache(maxsize=_html_cache.maxsize)
+_url_locks = weakref.WeakValueDictionary()
+
+# Finished scrape results by (url, question) and per-link search results by
+# (link, question); only successful extractions are cached. The search TTL is
+# tunable (0 disables it) since page content drifts at a site-specific pace.
+_scrape_cache = TTLCache(maxsize=256, ttl=3600)
+_search_result_cache = TTLCache(maxsize=2000, ttl=int(os.getenv("SEARCH_CACHE_TTL_SECONDS", "3600")))
+# Classifications of repeated inputs within a session, keyed by (session_id,
+# normalized input); 0 disables it. Only self-contained ones are stored (see
+# _is_context_free), since follow-ups like "next page" depend on earlier turns.
+_classification_cache = TTLCache(maxsize=1024, ttl=int(os.getenv("CLASSIFICATION_CACHE_TTL_SECONDS", "300")))
+
+def _is_context_free(classification: RequestClassification, user_input: str) -> bool:
+    """Whether the classification follows from `user_input` alone and is safe to reuse"""
+    if classification.request_type == "regular_question":
+        return True
+    return classification.request_type == "scrape_data" and bool(classification.url) and classification.url in user_input
+
+def forget_session_classifications(session_id: str):
+    """Drop cached classifications for a session whose history was cleared"""
+    for key in [k for k in list(_classification_cache.keys()) if k[0] == session_id]:
+        _classification_cache.pop(key, None)
+
+# Limit in-flight OpenAI search calls across all sessions (rate limits + memory)
+_search_semaphore = asyncio.Semaphore(max(1, int(os.getenv("OPENAI_SEARCH_CONCURRENCY", "20"))))
+
+class _RequestRateLimiter:
+    """Spaces out request starts to stay under a requests-per-minute budget"""
+    
+    def __init__(self, requests_per_minute: int):
+        self._interval = 60.0 / requests_per_minute
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def wait(self):
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+# Optional requests-per-minute cap for link searches (unset = no cap)
+_search_max_rpm = int(os.getenv("OPENAI_SEARCH_MAX_RPM", "0"))
+_search_rate_limiter = _RequestRateLimiter(_search_max_rpm) if _search_max_rpm > 0 else None
+
+# Opt-in: route large link sets through the OpenAI Batch API (cheaper, but
+# results can take minutes, so it's meant for non-interactive runs)
+_SEARCH_USE_BATCH_API = os.getenv("SEARCH_USE_BATCH_API", "").lower() in ("1", "true", "yes")
+_BATCH_API_MIN_LINKS = 10
+_BATCH_API_POLL_INTERVAL = 10  # seconds
+_BATCH_API_MAX_WAIT = 30 * 60  # seconds before giving up and searching online
+
+# Links packed into one search completion (1 = one call per link); links the
+# combined answer misses are searched individually
+_SEARCH_LINKS_PER_CALL = max(1, int(os.getenv("OPENAI_SEARCH_LINKS_PER_CALL", "5")))
+
+# Number of pages scraped concurrently in a multi-page request
+_PAGE_BATCH_SIZE = max(1, int(os.getenv("SCRAPE_PAGE_CONCURRENCY", "4")))
+
+# Cap on page fetches (HTTP or Selenium) in flight across all sessions (politeness/
+# rate limits); held only for the fetch, not the LLM steps that follow. Bounded so an
+# unbalanced release fails loudly instead of silently raising the cap
+_page_semaphore = asyncio.BoundedSemaphore(max(_PAGE_BATCH_SIZE, 8))
+
+# Below this many links from the analyzer, scrape_data_bs falls back to
+# reading job links from the HTML and then URLs from the analysis text
+_MIN_LINKS_TARGET = 5
+
+# Job-type questions and how many job-detail anchors make the LLM link
+# analyzer unnecessary for a page
+_JOB_QUESTION_RE = re.compile(r'\b(?:jobs?|positions?|vacanc(?:y|ies)|roles?|careers?|openings?|salar(?:y|ies))\b', re.IGNORECASE)
+_HEURISTIC_LINKS_THRESHOLD = 10
+
+# Most anchors listed in the distilled page sent to the link analyzer
+_MAX_PROMPT_ANCHORS = 2000
+
+# Visible page text included after the anchor list; keeps token use bounded on huge pages
+_MAX_PROMPT_TEXT_CHARS = 40_000
+
+# URLs mentioned in the analysis text, used as a last-resort link source.
+# Length-capped and possessive so long runs without whitespace can't backtrack.
+_URL_IN_TEXT_RE = re.compile(r'https?://[^\s<>"\']{2,2048}+')
+
+# Account/cart/legal pages that never hold the detail data a search is after
+_SKIP_LINK_PATH_RE = re.compile(
+    r'/(?:log-?in|log-?out|sign-?in|sign-?up|register|cart|basket|checkout|account|'
+    r'privacy(?:-policy)?|terms(?:-of-(?:use|service))?|cookies?(?:-policy)?)/?$',
+    re.IGNORECASE
+)
+
+# Job-detail hrefs: relative "/jobs/<something>" or an absolute URL mentioning
+# "jobs" (case-insensitive, matched without lower-casing every href)
+_JOB_HREF_RE = re.compile(r'/jobs/.|https?://.*jobs', re.IGNORECASE | re.DOTALL)
+
+# Listing navigation under /jobs/ (categories, searches, pagination...) that
+# shouldn't count as job-detail pages when deciding to skip the link analyzer
+_JOB_NAV_PATH_RE = re.compile(
+    r'/jobs/(?:categor(?:y|ies)|search|locations?|page|tags?|types?|filters?|sectors?|industr(?:y|ies))\b',
+    re.IGNORECASE
+)
+
+# Page-range phrasings recognised in a question, tried in order
+_PAGE_RANGE_PATTERNS = (
+    re.compile(r"page(?:s)?\s*(\d+)\s*(?:to|until|-)\s*(\d+)", re.IGNORECASE),  # "pages 1 to 5", "page 1-3"
+    re.compile(r"page\s+(\d+)\s+to\s+page\s+(\d+)", re.IGNORECASE),             # "page 1 to page 10"
+    re.compile(r"from\s+page\s*(\d+)\s*(?:to|until|-)\s*(?:page\s*)?(\d+)", re.IGNORECASE),  # "from page 1 to 5"
+)
+
+# Alternative field names seen in extracted job data, in order of preference
+_TITLE_KEYS = ('title', 'role', 'position')
+_LOCATION_KEYS = ('location', 'place')
+_SALARY_KEYS = ('salary', 'payRate', 'pay', 'wage')
+_COMPANY_KEYS = ('company', 'employer', 'organization')
+_JOB_ID_KEYS = ('jobId', 'jobNumber', 'id')
+_WORK_TYPE_KEYS = ('workType', 'type', 'employment_type')
+_JOB_FIELD_KEYS = ('title', 'role', 'position', 'job', 'salary', 'location')
+
+def _first_field(job: Dict[str, Any], keys: tuple, default: Any) -> Any:
+    """Return the first truthy value among `keys` in `job`, or `default`"""
+    return next((job[k] for k in keys if job.get(k)), default)
+
+def _build_scraped_context(scraped_results: List[Any]):
+    """Format scraped result items as job context for the Q&A agent, or None if there are no jobs"""
+    # Extract all jobs from the new structured format
+    all_jobs = []
+    
+    for result_item in scraped_results:
+        if not isinstance(result_item, dict):
+            continue
+            
+        extracted_data = result_item.get('extracted_data', {})
+        
+        # Handle different formats in extracted_data
+        if isinstance(extracted_data, dict):
+            # Case 1: extracted_data contains a 'jobs' array
+            if 'jobs' in extracted_data and isinstance(extracted_data['jobs'], list):
+                all_jobs.extend(extracted_data['jobs'])
+            # Case 2: extracted_data is a direct job object  
+            elif 'title' in extracted_data or 'role' in extracted_data:
+                all_jobs.append(extracted_data)
+            # Case 3: extracted_data contains job fields directly
+            elif any(key in extracted_data for key in _JOB_FIELD_KEYS):
+                all_jobs.append(extracted_data)
+        # Case 4: extracted_data is a list of jobs
+        elif isinstance(extracted_data, list):
+            all_jobs.extend(extracted_data)
+    
+    if not all_jobs:
+        logger.debug("⚠️ No job data found in extracted results")
+        return None
+        
+    logger.debug("✅ Extracted %d individual jobs for context", len(all_jobs))
+    
+    # Create structured context with full job data for salary analysis
+    parts = [
+        "PREVIOUS SCRAPED JOB DATA:\n\n",
+        f"Found {len(all_jobs)} job listings with the following details:\n\n",
+    ]
+    
+    for i, job in enumerate(all_jobs, 1):
+        # Handle different possible field names
+        title = _first_field(job, _TITLE_KEYS, 'Unknown Position')
+        location = _first_field(job, _LOCATION_KEYS, 'Unknown Location')
+        salary = _first_field(job, _SALARY_KEYS, 'Not specified')
+        company = _first_field(job, _COMPANY_KEYS, 'Unknown Company')
+        job_id = _first_field(job, _JOB_ID_KEYS, '')
+        work_type = _first_field(job, _WORK_TYPE_KEYS, '')
+        
+        parts.append(
+            f"{i}. {title}\n"
+            f"   Location: {location}\n"
+            f"   Salary: {salary}\n"
+            + (f"   Company: {company}\n" if company != 'Unknown Company' else "")
+            + (f"   Type: {work_type}\n" if work_type else "")
+            + (f"   Job ID: {job_id}\n" if job_id else "")
+            + "\n"
+        )
+    
+    return "".join(parts)
 
 # Simple context extraction for scraped data follow-up questions
 async def get_scraped_data_context(session: SQLiteSession) -> str:
     """Extract previous scraped data from conversation history for follow-up questions"""
     try:
-        # Get recent conversation history using the correct method
-        items = await session.get_items()
+        # Fast path: results stored alongside the session by the last scrape
+        blob = last_scrape_results.get(session.session_id)
+        if blob is not None:
+            context = _build_scraped_context(orjson.loads(blob))
+            if context is not None:
+                return context
+        
+        # The newest scrape wins: tuned sessions let SQLite find that one message;
+        # otherwise only the tail of the history is scanned
+        if isinstance(session, TunedSQLiteSession):
+            latest_item = await session.get_latest_item_containing(_EXTRACTED_DATA_MARKER)
+            items = [latest_item] if latest_item is not None else []
+        else:
+            items = await session.get_items(limit=_CONTEXT_ITEMS_LIMIT)
         if not items:
             return "No previous scraped data found in conversation history."
             
-        print(f"✅ Retrieved {len(items)} conversation items")
+        logger.debug("✅ Retrieved %d conversation items", len(items))
         
         # Look for assistant responses containing scraped data
         for item in reversed(items):  # Check most recent first
@@ -102,117 +541,49 @@ async def get_scraped_data_context(session: SQLiteSession) -> str:
                 continue
                 
             # Look for assistant messages with scraped data
-            if role == 'assistant' and '**Extracted Data:**' in content:
-                print(f"✅ Found scraped data in assistant message")
+            if role != 'assistant':
+                continue
+            json_start = content.find(_EXTRACTED_DATA_MARKER)
+            if json_start != -1:
+                logger.debug("✅ Found scraped data in assistant message")
                 
                 # Extract the JSON part after "**Extracted Data:**"
                 try:
-                    # Find the start of the JSON data
-                    json_start = content.find('**Extracted Data:**')
-                    if json_start == -1:
-                        continue
-                        
-                    # Get everything after the "**Extracted Data:**" marker
-                    json_section = content[json_start + len('**Extracted Data:**'):].strip()
-                    
-                    # Find the JSON array (starts with [ and ends with ])
-                    bracket_start = json_section.find('[')
+                    # Find the JSON array (starts with [ and ends with ]) in place,
+                    # without copying the message tail first
+                    bracket_start = content.find('[', json_start + len(_EXTRACTED_DATA_MARKER))
                     if bracket_start == -1:
                         continue
                         
-                    # Find the matching closing bracket
-                    bracket_count = 0
-                    json_end = -1
-                    for i, char in enumerate(json_section[bracket_start:], bracket_start):
-                        if char == '[':
-                            bracket_count += 1
-                        elif char == ']':
-                            bracket_count -= 1
-                            if bracket_count == 0:
-                                json_end = i + 1
-                                break
-                    
-                    if json_end == -1:
-                        continue
-                        
-                    json_text = json_section[bracket_start:json_end]
-                    
-                    # Parse the JSON to extract job information
-                    import json
-                    scraped_results = json.loads(json_text)
+                    # The array is normally the tail of the message, so try a
+                    # straight parse first; otherwise let the C decoder find
+                    # where the array ends (brackets inside strings are fine)
+                    try:
+                        scraped_results = orjson.loads(content[bracket_start:])
+                    except orjson.JSONDecodeError:
+                        scraped_results, _ = _json_decoder.raw_decode(content, bracket_start)
                     
                     if not scraped_results:
                         continue
                         
-                    print(f"✅ Successfully parsed {len(scraped_results)} result items from JSON data")
-                    
-                    # Extract all jobs from the new structured format
-                    all_jobs = []
+                    logger.debug("✅ Successfully parsed %d result items from JSON data", len(scraped_results))
                     
-                    for result_item in scraped_results:
-                        if not isinstance(result_item, dict):
-                            continue
-                            
-                        extracted_data = result_item.get('extracted_data', {})
-                        
-                        # Handle different formats in extracted_data
-                        if isinstance(extracted_data, dict):
-                            # Case 1: extracted_data contains a 'jobs' array
-                            if 'jobs' in extracted_data and isinstance(extracted_data['jobs'], list):
-                                all_jobs.extend(extracted_data['jobs'])
-                            # Case 2: extracted_data is a direct job object  
-                            elif 'title' in extracted_data or 'role' in extracted_data:
-                                all_jobs.append(extracted_data)
-                            # Case 3: extracted_data contains job fields directly
-                            elif any(key in extracted_data for key in ['title', 'role', 'position', 'job', 'salary', 'location']):
-                                all_jobs.append(extracted_data)
-                        # Case 4: extracted_data is a list of jobs
-                        elif isinstance(extracted_data, list):
-                            all_jobs.extend(extracted_data)
-                    
-                    if not all_jobs:
-                        print("⚠️ No job data found in extracted results")
+                    context = _build_scraped_context(scraped_results)
+                    if context is None:
                         continue
-                        
-                    print(f"✅ Extracted {len(all_jobs)} individual jobs for context")
-                    
-                    # Create structured context with full job data for salary analysis
-                    context = "PREVIOUS SCRAPED JOB DATA:\n\n"
-                    context += f"Found {len(all_jobs)} job listings with the following details:\n\n"
-                    
-                    for i, job in enumerate(all_jobs, 1):
-                        # Handle different possible field names
-                        title = job.get('title') or job.get('role') or job.get('position') or 'Unknown Position'
-                        location = job.get('location') or job.get('place') or 'Unknown Location'
-                        salary = job.get('salary') or job.get('payRate') or job.get('pay') or job.get('wage') or 'Not specified'
-                        company = job.get('company') or job.get('employer') or job.get('organization') or 'Unknown Company'
-                        job_id = job.get('jobId') or job.get('jobNumber') or job.get('id') or ''
-                        work_type = job.get('workType') or job.get('type') or job.get('employment_type') or ''
-                        
-                        context += f"{i}. {title}\n"
-                        context += f"   Location: {location}\n"
-                        context += f"   Salary: {salary}\n"
-                        if company != 'Unknown Company':
-                            context += f"   Company: {company}\n"
-                        if work_type:
-                            context += f"   Type: {work_type}\n"
-                        if job_id:
-                            context += f"   Job ID: {job_id}\n"
-                        context += "\n"
-                    
                     return context
                     
                 except json.JSONDecodeError as e:
-                    print(f"❌ JSON parsing failed: {e}")
+                    logger.warning("❌ JSON parsing failed: %s", e)
                     continue
                 except Exception as parse_error:
-                    print(f"❌ Error parsing scraped data: {parse_error}")
+                    logger.warning("❌ Error parsing scraped data: %s", parse_error)
                     continue
         
         return "No previous scraped data found in conversation history."
         
     except Exception as e:
-        print(f"⚠️ Error getting scraped data context: {e}")
+        logger.warning("⚠️ Error getting scraped data context: %s", e)
         return "Unable to retrieve previous scraped data context."
 
 # Agent 1: Request Classifier - Determines if user wants regular Q&A or web scraping
@@ -373,164 +744,475 @@ Return a summary explaining what type of links were collected and why they match
 
 # ─── OpenAI Search Function for Link Processing ────────────────────────────────
 
-async def search_single_link_with_openai(link: str, user_question: str, index: int, total_links: int) -> Dict:
-    """
-    Search a single link using OpenAI's search API
-    """
-    # Skip links marked as "-" (no website available)
-    if link == "-":
-        print(f"⏭️  Skipping link {index}/{total_links}: No website available")
-        return {
-            "extracted_data": {},
-            "source_url": "-",
-            "summary": "No website available for this club"
-        }
-    
-    try:
-        print(f"🔍 Searching link {index}/{total_links}: {link}")
-        
-        # Create a focused search prompt that extracts REAL data from the website
-        search_prompt = f"""CRITICAL: You must extract REAL, ACTUAL data from this specific website: {link}
+# Search responses beyond this size are rejected instead of parsed
+_MAX_SEARCH_RESPONSE_CHARS = 200_000
+
+# Extraction rules and warnings shared by the single- and multi-link search prompts
+_SEARCH_DATA_RULES = """REAL DATA EXTRACTION RULES:
+- Extract ACTUAL job titles, company names, salary figures, locations from the webpage
+- Use REAL contact information (emails, phone numbers, addresses) if present
+- Copy EXACT product names, prices, descriptions from the site
+- Preserve ACTUAL dates, reference numbers, and specific details
+- Use the PRECISE wording and formatting from the original webpage
 
-USER REQUEST: {user_question}
+"""
+
+_SEARCH_WARNINGS = """CRITICAL WARNINGS:
+- DO NOT use placeholder text like "Job Role 1", "Details 1", "Location A"
+- DO NOT generate sample data - only extract what actually exists on the page
+- If the page is inaccessible or contains no relevant data, return empty extracted_data
+- The user wants REAL scraped data, not examples or templates"""
+
+# Per-link search prompt; only the link and the user's question vary. Static
+# instructions come first and the link/question last, so every search shares one
+# long identical prefix that OpenAI's prompt caching can reuse
+_SEARCH_PROMPT_TEMPLATE = string.Template("""CRITICAL: You must extract REAL, ACTUAL data from the specific website given at the end of this message.
 
 STRICT EXTRACTION REQUIREMENTS:
-1. ACCESS THE ACTUAL WEBSITE CONTENT at {link}
+1. ACCESS THE ACTUAL WEBSITE CONTENT at the WEBSITE given below
 2. Extract REAL data - NO dummy examples, NO placeholders, NO generic samples
 3. Use the EXACT text, numbers, and details found on the actual webpage
 4. If you cannot access real data from the site, return empty extracted_data object
 5. DO NOT generate example data like "Job Role 1", "Pay details 1", "Location 1"
 
-REAL DATA EXTRACTION RULES:
-- Extract ACTUAL job titles, company names, salary figures, locations from the webpage
-- Use REAL contact information (emails, phone numbers, addresses) if present
-- Copy EXACT product names, prices, descriptions from the site
-- Preserve ACTUAL dates, reference numbers, and specific details
-- Use the PRECISE wording and formatting from the original webpage
-
-RESPONSE FORMAT:
+""" + _SEARCH_DATA_RULES + """RESPONSE FORMAT:
 Return your response as a valid JSON object with this exact structure:
-{{
-    "extracted_data": {{
+{
+    "extracted_data": {
         // REAL data fields with ACTUAL values from the website
         // For jobs: actual "title", "location", "salary", "company", "jobId"
         // For contacts: actual "name", "email", "phone", "address"  
         // For products: actual "name", "price", "description", "sku"
-    }},
-    "source_url": "{link}",
+    },
+    "source_url": "the exact WEBSITE URL given below",
     "summary": "Brief description of the REAL information found on this specific webpage"
-}}
+}
 
-CRITICAL WARNINGS:
-- DO NOT use placeholder text like "Job Role 1", "Details 1", "Location A"
-- DO NOT generate sample data - only extract what actually exists on the page
-- If the page is inaccessible or contains no relevant data, return empty extracted_data
-- The user wants REAL scraped data, not examples or templates"""
-        
-        # Use OpenAI search API with structured output requirement
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini-search-preview",
-            web_search_options={"search_context_size": "high"},
-            messages=[
-                {
-                    "role": "user",
-                    "content": search_prompt,
-                }
-            ]
-        )
-        
-        response_content = completion.choices[0].message.content
-        
-        # Parse the structured JSON response
+""" + _SEARCH_WARNINGS + """
+
+WEBSITE: ${link}
+
+USER REQUEST: ${user_question}""")
+
+_MULTI_SEARCH_PROMPT_TEMPLATE = string.Template("""CRITICAL: You must extract REAL, ACTUAL data from EACH of the specific websites listed at the end of this message.
+
+STRICT EXTRACTION REQUIREMENTS:
+1. ACCESS THE ACTUAL WEBSITE CONTENT of every listed link, separately
+2. Extract REAL data - NO dummy examples, NO placeholders, NO generic samples
+3. Use the EXACT text, numbers, and details found on each actual webpage
+4. If you cannot access real data from a site, return an empty extracted_data object for it
+5. DO NOT generate example data like "Job Role 1", "Pay details 1", "Location 1"
+6. NEVER mix data between links - each item only contains data from its own link
+
+""" + _SEARCH_DATA_RULES + """RESPONSE FORMAT:
+Return your response as a valid JSON array with exactly one object per link, using the link's id:
+[
+    {
+        "id": 1,
+        "extracted_data": {
+            // REAL data fields with ACTUAL values from that website
+        },
+        "source_url": "the link with this id",
+        "summary": "Brief description of the REAL information found on this specific webpage"
+    }
+]
+
+""" + _SEARCH_WARNINGS + """
+
+LINKS (id. url):
+${links}
+
+USER REQUEST: ${user_question}""")
+
+@functools.lru_cache(maxsize=32)
+def _search_prompt_for_question(user_question: str) -> string.Template:
+    """
+    The search prompt with the user's question already filled in, leaving only
+    ${link}. Every link searched for the same question shares this template.
+    """
+    # Escape "$" so the question survives the second substitution verbatim
+    return string.Template(
+        _SEARCH_PROMPT_TEMPLATE.safe_substitute(user_question=user_question.replace("$", "$$"))
+    )
+
+def _no_website_result() -> Dict:
+    """Placeholder result for links marked "-" (no website available)"""
+    return {
+        "extracted_data": {},
+        "source_url": "-",
+        "summary": "No website available for this club"
+    }
+
+def _search_request(link: str, user_question: str) -> Dict:
+    """Chat completion arguments for searching one link (shared by online and batch calls)"""
+    # Create a focused search prompt that extracts REAL data from the website
+    search_prompt = _search_prompt_for_question(user_question).substitute(link=link)
+    return {
+        "model": "gpt-4o-mini-search-preview",
+        "web_search_options": {"search_context_size": "high"},
+        "messages": [
+            {
+                "role": "user",
+                "content": search_prompt,
+            }
+        ],
+    }
+
+def _multi_search_request(chunk_links: List[str], user_question: str) -> Dict:
+    """Chat completion arguments for searching several links in one call (link ids are 1-based positions)"""
+    numbered_links = "\n".join(f"{n}. {link}" for n, link in enumerate(chunk_links, 1))
+    search_prompt = _MULTI_SEARCH_PROMPT_TEMPLATE.substitute(links=numbered_links, user_question=user_question)
+    return {
+        "model": "gpt-4o-mini-search-preview",
+        "web_search_options": {"search_context_size": "high"},
+        "messages": [
+            {
+                "role": "user",
+                "content": search_prompt,
+            }
+        ],
+    }
+
+def _parse_multi_search_response(response_content: str, chunk_links: List[str]) -> Dict[int, Dict]:
+    """
+    Map a multi-link completion back to results keyed by position in
+    `chunk_links`. Items that are missing or malformed are left out so the
+    caller can search those links on their own.
+    """
+    if not response_content or len(response_content) > _MAX_SEARCH_RESPONSE_CHARS * len(chunk_links):
+        return {}
+    
+    try:
+        items = orjson.loads(response_content)
+    except orjson.JSONDecodeError:
+        # Tolerate prose or code fences around the array
+        start = response_content.find('[')
+        if start == -1:
+            return {}
         try:
-            import json
-            import re
-            
-            # First, try to parse the entire response as JSON
-            try:
-                result_data = json.loads(response_content)
-            except json.JSONDecodeError:
-                # If that fails, look for JSON object in the response
-                json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response_content, re.DOTALL)
-                if json_match:
-                    result_data = json.loads(json_match.group())
-                else:
-                    # Fallback: create structured data from response
-                    result_data = {
-                        "extracted_data": {"content": response_content},
-                        "source_url": link,
-                        "summary": "Data extracted but not in expected JSON format"
-                    }
-            
-            # Validate the expected structure
-            if "extracted_data" in result_data and "source_url" in result_data and "summary" in result_data:
-                print(f"✅ Successfully extracted structured data from: {link}")
-                return result_data
-            else:
-                # Fallback structure if format is incorrect
-                print(f"⚠️ Extracted data with format issues from: {link}")
-                return {
-                    "extracted_data": result_data.get("extracted_data", result_data),
+            items, _ = _json_decoder.raw_decode(response_content, start)
+        except json.JSONDecodeError:
+            return {}
+    if isinstance(items, dict):
+        items = items.get("results")
+    if not isinstance(items, list):
+        return {}
+    
+    results = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        link_id = item.get("id")
+        if not isinstance(link_id, int) or not 1 <= link_id <= len(chunk_links):
+            continue
+        extracted_data = item.get("extracted_data")
+        if not isinstance(extracted_data, dict) or "summary" not in item:
+            continue
+        results[link_id - 1] = {
+            "extracted_data": extracted_data,
+            "source_url": chunk_links[link_id - 1],
+            "summary": item["summary"]
+        }
+    return results
+
+def _parse_search_response(response_content: str, link: str) -> Dict:
+    """Turn a search completion into a {extracted_data, source_url, summary} result"""
+    # Completions can carry null/empty content (e.g. refusals); that is a failed
+    # search, so it must not look like an extraction and get cached
+    if not response_content or not response_content.strip():
+        logger.warning("⚠️ Empty search response for %s", link)
+        return {
+            "extracted_data": {},
+            "source_url": link,
+            "summary": "Search returned no content"
+        }
+    # A runaway completion isn't worth parsing - bound the worst case up front
+    if len(response_content) > _MAX_SEARCH_RESPONSE_CHARS:
+        logger.warning("⚠️ Search response for %s too large to parse (%d chars)", link, len(response_content))
+        return {
+            "extracted_data": {},
+            "source_url": link,
+            "summary": "Response too large to parse"
+        }
+    
+    try:
+        # First, try to parse the entire response as JSON
+        try:
+            result_data = orjson.loads(response_content)
+        except orjson.JSONDecodeError:
+            # If that fails, decode the first JSON object embedded in the response
+            result_data = _decode_first_json_object(response_content)
+            if result_data is None:
+                logger.debug("⚠️ No JSON object in response from %s: %.300r", link, response_content)
+                # Fallback: create structured data from response
+                result_data = {
+                    "extracted_data": {"content": response_content},
                     "source_url": link,
-                    "summary": result_data.get("summary", "Data extracted but format was incorrect")
+                    "summary": "Data extracted but not in expected JSON format"
                 }
-                
-        except (json.JSONDecodeError, Exception) as e:
-            print(f"❌ JSON parsing error for {link}: {e}")
+        
+        # Validate the expected structure
+        if "extracted_data" in result_data and "source_url" in result_data and "summary" in result_data:
+            logger.debug("✅ Successfully extracted structured data from: %s", link)
+            return result_data
+        else:
+            # Fallback structure if format is incorrect
+            logger.debug("⚠️ Extracted data with format issues from: %s", link)
             return {
-                "extracted_data": {"raw_content": response_content[:500]},
+                "extracted_data": result_data.get("extracted_data", result_data),
                 "source_url": link,
-                "summary": f"Failed to parse response as JSON: {str(e)}"
+                "summary": result_data.get("summary", "Data extracted but format was incorrect")
             }
             
     except Exception as e:
-        print(f"❌ Error searching {link}: {e}")
+        logger.warning("❌ JSON parsing error for %s: %s", link, e)
+        # Only a short excerpt goes into the results (and so the session history)
+        logger.debug("Unparsed response from %s: %s", link, response_content)
+        return {
+            "extracted_data": {"raw_content": response_content[:200]},
+            "source_url": link,
+            "summary": f"Failed to parse response as JSON: {str(e)}"
+        }
+
+async def _search_links_with_batch_api(links: List[str], indices: List[int], user_question: str) -> Dict[int, Dict]:
+    """
+    Search `links[i]` for every i in `indices` as one OpenAI Batch API job,
+    packing _SEARCH_LINKS_PER_CALL links into each request like the online path.
+    Returns results keyed by index; links missing from the map (failed items,
+    or the whole batch on error/timeout) should be searched online instead.
+    """
+    chunks = [indices[k:k + _SEARCH_LINKS_PER_CALL] for k in range(0, len(indices), _SEARCH_LINKS_PER_CALL)]
+    lines = [
+        orjson.dumps({
+            # The chunk's link indices travel in the id, e.g. "links-3-4-7"
+            "custom_id": "links-" + "-".join(map(str, chunk)),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": (
+                _search_request(links[chunk[0]], user_question) if len(chunk) == 1
+                else _multi_search_request([links[i] for i in chunk], user_question)
+            ),
+        })
+        for chunk in chunks
+    ]
+    
+    try:
+        batch_file = await client.files.create(
+            file=("search_batch.jsonl", b"\n".join(lines)), purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        logger.info("📦 Submitted OpenAI batch %s with %d links", batch.id, len(indices))
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + _BATCH_API_MAX_WAIT
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            if loop.time() > deadline:
+                logger.warning("⏱️ OpenAI batch %s still %s - cancelling and searching online", batch.id, batch.status)
+                await client.batches.cancel(batch.id)
+                return {}
+            await asyncio.sleep(_BATCH_API_POLL_INTERVAL)
+            batch = await client.batches.retrieve(batch.id)
+        
+        if batch.status != "completed" or not batch.output_file_id:
+            logger.warning("❌ OpenAI batch %s ended as %s - searching online", batch.id, batch.status)
+            return {}
+        
+        output = await client.files.content(batch.output_file_id)
+    except Exception as e:
+        logger.warning("❌ OpenAI batch search failed: %s - searching online", e)
+        return {}
+    
+    results = {}
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            item = orjson.loads(line)
+            chunk = [int(i) for i in item["custom_id"].removeprefix("links-").split("-")]
+            response = item.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            response_content = response["body"]["choices"][0]["message"]["content"] or ""
+            if len(chunk) == 1:
+                results[chunk[0]] = _parse_search_response(response_content, links[chunk[0]])
+            else:
+                found = _parse_multi_search_response(response_content, [links[i] for i in chunk])
+                for pos, result in found.items():
+                    results[chunk[pos]] = result
+        except Exception as e:
+            # One bad line only sends its own links back to the online path
+            logger.debug("⚠️ Skipping unusable batch output line: %s", e)
+    
+    logger.info("📦 OpenAI batch %s returned %d/%d results", batch.id, len(results), len(indices))
+    return results
+
+async def search_single_link_with_openai(link: str, user_question: str, index: int, total_links: int) -> Dict:
+    """
+    Search a single link using OpenAI's search API
+    """
+    # Skip links marked as "-" (no website available)
+    if link == "-":
+        logger.debug("⏭️  Skipping link %d/%d: No website available", index, total_links)
+        return _no_website_result()
+    
+    try:
+        logger.debug("🔍 Searching link %d/%d: %s", index, total_links, link)
+        
+        # Use OpenAI search API with structured output requirement
+        completion = await client.chat.completions.create(**_search_request(link, user_question))
+        
+        response_content = completion.choices[0].message.content
+        return _parse_search_response(response_content, link)
+            
+    except Exception as e:
+        logger.warning("❌ Error searching %s: %s", link, e)
         return {
             "extracted_data": {},
             "source_url": link,
             "summary": f"Error accessing page: {str(e)}"
         }
 
-async def search_links_with_openai(links: List[str], user_question: str, update_progress_callback=None) -> List[Dict]:
+async def search_link_chunk_with_openai(chunk_links: List[str], user_question: str) -> Dict[int, Dict]:
     """
-    Use OpenAI's search API to extract specific information from a list of links using parallel processing
+    Search several links with one completion. Returns results keyed by
+    position in `chunk_links`; links missing from the map (or all of them,
+    on error) should be searched individually.
     """
+    try:
+        logger.debug("🔍 Searching %d links in one call: %s", len(chunk_links), chunk_links)
+        completion = await client.chat.completions.create(**_multi_search_request(chunk_links, user_question))
+        return _parse_multi_search_response(completion.choices[0].message.content, chunk_links)
+    except Exception as e:
+        logger.warning("❌ Error searching %d links in one call: %s", len(chunk_links), e)
+        return {}
+
+async def search_links_with_openai(links: List[str], user_question: str, update_progress_callback=None, use_batch: Optional[bool] = None, force_rescrape: bool = False) -> List[Dict]:
+    """
+    Use OpenAI's search API to extract specific information from a list of links using parallel processing.
+    `use_batch` sends large link sets through the Batch API instead (for callers that
+    aren't waiting interactively); None defers to the SEARCH_USE_BATCH_API setting.
+    Successful results are cached per (link, question) unless `force_rescrape` is set.
+    Links are normalised and deduplicated first, so the result list has one entry
+    per unique link (plus one per "-" placeholder), in order.
+    """
+    if use_batch is None:
+        use_batch = _SEARCH_USE_BATCH_API
+    
+    # Every duplicate would cost a full web-search round trip
+    unique_links = _dedupe_links(links)
+    if len(unique_links) < len(links):
+        logger.debug("🧹 Dropped %d duplicate or skip-listed links", len(links) - len(unique_links))
+    links = unique_links
     total_links = len(links)
-    print(f"🚀 Starting parallel processing of {total_links} links...")
+    logger.debug("🚀 Starting parallel processing of %d links...", total_links)
     
     if update_progress_callback:
         update_progress_callback("searching", f"🚀 Starting parallel search of {total_links} links...")
     
-    # Create tasks for parallel processing
-    tasks = []
-    for i, link in enumerate(links, 1):
-        task = search_single_link_with_openai(link, user_question, i, total_links)
-        tasks.append(task)
+    async def bounded_search(link: str, index: int) -> Dict:
+        async with _search_semaphore:
+            if _search_rate_limiter:
+                await _search_rate_limiter.wait()
+            return await search_single_link_with_openai(link, user_question, index, total_links)
+    
+    async def bounded_chunk_search(chunk_indices: List[int]) -> List[tuple]:
+        chunk_links = [links[i] for i in chunk_indices]
+        async with _search_semaphore:
+            if _search_rate_limiter:
+                await _search_rate_limiter.wait()
+            found = await search_link_chunk_with_openai(chunk_links, user_question)
+        chunk_results = [(chunk_indices[pos], result) for pos, result in found.items()]
+        
+        # Links the combined answer missed or mangled are searched one by one
+        missing = [i for pos, i in enumerate(chunk_indices) if pos not in found]
+        if missing:
+            logger.debug("↩️ Searching %d/%d links individually after a combined call", len(missing), len(chunk_indices))
+            retried = await asyncio.gather(*(bounded_search(links[i], i + 1) for i in missing), return_exceptions=True)
+            chunk_results.extend(zip(missing, retried))
+        return chunk_results
+    
+    # Only real links need a search task; "-" placeholders are filled in by index
+    real_indices = [i for i, link in enumerate(links) if link != "-"]
+    
+    # Links already searched for this question recently are served from the cache
+    cached_results = {}
+    if not force_rescrape:
+        for i in real_indices:
+            cached = _search_result_cache.get(_search_cache_key(links[i], user_question))
+            if cached is not None:
+                cached_results[i] = cached
+    pending_indices = [i for i in real_indices if i not in cached_results]
+    
+    # Large link sets can go through the Batch API; anything it misses is searched online
+    batch_results = {}
+    if use_batch and len(pending_indices) >= _BATCH_API_MIN_LINKS:
+        if update_progress_callback:
+            update_progress_callback("searching", f"📦 Submitting {len(pending_indices)} links as an OpenAI batch job...")
+        batch_results = await _search_links_with_batch_api(links, pending_indices, user_question)
+    
+    online_indices = [i for i in pending_indices if i not in batch_results]
     
     # Execute all tasks in parallel with progress updates
-    print(f"⚡ Processing {len(tasks)} links in parallel...")
+    logger.debug(
+        "⚡ Processing %d links in parallel (%d cached, %d without a website skipped)...",
+        len(online_indices), len(cached_results), total_links - len(real_indices)
+    )
+    
+    # Run all searches concurrently, several links per call when enabled, and
+    # report progress as each call finishes rather than only at the end
+    if _SEARCH_LINKS_PER_CALL > 1 and len(online_indices) > 1:
+        jobs = [
+            online_indices[k:k + _SEARCH_LINKS_PER_CALL]
+            for k in range(0, len(online_indices), _SEARCH_LINKS_PER_CALL)
+        ]
+        search_job = bounded_chunk_search
+    else:
+        jobs = [[i] for i in online_indices]
+        
+        async def search_job(job_indices: List[int]) -> List[tuple]:
+            i = job_indices[0]
+            return [(i, await bounded_search(links[i], i + 1))]
+    
+    async def guarded_job(job_indices: List[int]) -> List[tuple]:
+        try:
+            return await search_job(job_indices)
+        except Exception as e:
+            return [(i, e) for i in job_indices]
     
-    # Use asyncio.gather to run all searches concurrently
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    online_results = []
+    for finished in asyncio.as_completed([guarded_job(job) for job in jobs]):
+        job_results = await finished
+        online_results.extend(job_results)
+        if update_progress_callback:
+            update_progress_callback("searching", f"🔍 Searched {len(online_results)}/{len(online_indices)} links...")
     
     # Handle any exceptions that occurred during parallel processing
-    processed_results = []
+    processed_results = [None] * total_links
     successful_results = 0
     
-    for i, result in enumerate(results, 1):
+    for i, link in enumerate(links):
+        if link == "-":
+            processed_results[i] = _no_website_result()
+    
+    for i, result in [*cached_results.items(), *batch_results.items(), *online_results]:
         if isinstance(result, Exception):
-            print(f"❌ Exception in link {i}: {result}")
-            processed_results.append({
+            logger.warning("❌ Exception in link %d: %s", i + 1, result)
+            processed_results[i] = {
                 "extracted_data": {},
-                "source_url": links[i-1] if i <= len(links) else "unknown",
+                "source_url": links[i],
                 "summary": f"Exception occurred during processing: {str(result)}"
-            })
+            }
         else:
-            processed_results.append(result)
+            processed_results[i] = result
             if result.get("extracted_data"):
                 successful_results += 1
+                _search_result_cache[_search_cache_key(links[i], user_question)] = result
     
-    print(f"🏁 Parallel processing completed: {successful_results}/{total_links} links successful")
+    logger.info("🏁 Parallel processing completed: %d/%d links successful", successful_results, total_links)
     
     if update_progress_callback:
         update_progress_callback("searching", f"✅ Parallel search completed: {successful_results}/{total_links} successful")
@@ -539,117 +1221,310 @@ async def search_links_with_openai(links: List[str], user_question: str, update_
 
 # ─── Multi-page Web Scraping Functions ────────────────────────────────────────
 
-async def scrape_data_bs(url: str, question: str, update_progress_callback=None) -> ScrapeResult:
-    """Enhanced scraping with link collection and OpenAI search workflow"""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (compatible; MyScraper/1.0; +https://yourdomain.com/bot)"
-    }
+@functools.lru_cache(maxsize=None)
+def _chromedriver_path() -> str:
+    """
+    Resolve the ChromeDriver binary once per process. A pinned CHROMEDRIVER_PATH
+    wins; otherwise WebDriver Manager downloads the matching version.
+    """
+    pinned_path = os.getenv("CHROMEDRIVER_PATH")
+    if pinned_path:
+        return pinned_path
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
 
-    # Step 1: Fetch website content
-    html = None
-    try:
-        print(f"🌐 Fetching content from: {url}")
-        if update_progress_callback:
-            update_progress_callback("fetching", f"🌐 Fetching content from: {url[:50]}...")
+def _create_chrome_driver():
+    """Start a new headless Chrome instance"""
+    # Where the ChromeDriver binary comes from, for the log lines below
+    driver_source = "pinned CHROMEDRIVER_PATH" if os.getenv("CHROMEDRIVER_PATH") else "WebDriver Manager"
+    logger.debug("🔧 Setting up Chrome with %s...", driver_source)
             
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()  # throws if status != 200
-        html = response.text
-        print(f"✅ Successfully fetched with requests (length: {len(html)})")
-    except Exception as e:
-        print(f"❌ Request failed: {e}. Trying with Selenium...")
-        try:
-            from selenium import webdriver
-            from selenium.webdriver.chrome.options import Options
-            from webdriver_manager.chrome import ChromeDriverManager
-            from selenium.webdriver.chrome.service import Service
-            
-            print("🔧 Setting up Chrome with WebDriver Manager for automatic version matching...")
-            
-            # Configure Chrome options with robust compatibility settings
-            chrome_options = Options()
+    # Configure Chrome options with robust compatibility settings
+    chrome_options = Options()
             
-            # Essential options for server/Docker environment
-            chrome_options.add_argument("--headless")  # Required for server environments
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--disable-software-rasterizer")
+    # Essential options for server/Docker environment
+    chrome_options.add_argument("--headless")  # Required for server environments
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--disable-software-rasterizer")
             
-            # Window and display options
-            chrome_options.add_argument("--window-size=1920,1080")
-            chrome_options.add_argument("--start-maximized")
+    # Window and display options
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--start-maximized")
             
-            # Stability and compatibility options
-            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-            chrome_options.add_argument("--disable-extensions")
-            chrome_options.add_argument("--disable-plugins")
-            chrome_options.add_argument("--disable-web-security")
-            chrome_options.add_argument("--disable-features=VizDisplayCompositor")
-            chrome_options.add_argument("--disable-dev-tools")
-            chrome_options.add_argument("--no-first-run")
-            chrome_options.add_argument("--no-default-browser-check")
-            chrome_options.add_argument("--ignore-certificate-errors")
-            chrome_options.add_argument("--ignore-ssl-errors")
+    # Stability and compatibility options
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-plugins")
+    chrome_options.add_argument("--disable-web-security")
+    chrome_options.add_argument("--disable-features=VizDisplayCompositor")
+    chrome_options.add_argument("--disable-dev-tools")
+    chrome_options.add_argument("--no-first-run")
+    chrome_options.add_argument("--no-default-browser-check")
+    chrome_options.add_argument("--ignore-certificate-errors")
+    chrome_options.add_argument("--ignore-ssl-errors")
             
-            # User agent to avoid blocking
-            chrome_options.add_argument("--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36")
+    # User agent to avoid blocking
+    chrome_options.add_argument("--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36")
             
-            # Try to initialize Chrome with WebDriver Manager for automatic version matching
-            driver = None
-            try:
-                # WebDriver Manager automatically downloads and manages the correct ChromeDriver version
-                service = Service(ChromeDriverManager().install())
-                driver = webdriver.Chrome(service=service, options=chrome_options)
-                print("✅ Chrome initialized with WebDriver Manager (automatic version matching)")
-            except Exception as driver_error:
-                print(f"❌ WebDriver Manager failed: {driver_error}")
-                print("🔄 Trying fallback with system ChromeDriver...")
-                try:
-                    # Fallback to system ChromeDriver with minimal options
-                    minimal_options = Options()
-                    minimal_options.add_argument("--headless")
-                    minimal_options.add_argument("--no-sandbox")
-                    minimal_options.add_argument("--disable-dev-shm-usage")
-                    minimal_options.add_argument("--disable-gpu")
-                    driver = webdriver.Chrome(options=minimal_options)
-                    print("✅ Chrome initialized with system ChromeDriver (fallback)")
-                except Exception as fallback_error:
-                    print(f"❌ System ChromeDriver also failed: {fallback_error}")
-                    raise Exception(f"All ChromeDriver methods failed: {driver_error}, {fallback_error}")
-            if driver:
-                driver.get(url)
-                html = driver.page_source
-                driver.quit()
-                print(f"✅ Successfully fetched with Selenium (length: {len(html)})")
-            else:
-                raise Exception("Failed to initialize Chrome driver")
-        except Exception as selenium_error:
-            print(f"❌ Selenium also failed: {selenium_error}")
-            return ScrapeResult(
-                text="Failed to scrape the website - both requests and Selenium failed",
-                results="[]"
-            )
+    # Try the pinned ChromeDriver, or WebDriver Manager for automatic version matching
+    driver = None
+    try:
+        service = Service(_chromedriver_path())
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+        logger.info("✅ Chrome initialized with %s", driver_source)
+    except Exception as driver_error:
+        logger.warning("❌ Chrome via %s failed: %s", driver_source, driver_error)
+        logger.info("🔄 Trying fallback with system ChromeDriver...")
+        try:
+            # Fallback to system ChromeDriver with minimal options
+            minimal_options = Options()
+            minimal_options.add_argument("--headless")
+            minimal_options.add_argument("--no-sandbox")
+            minimal_options.add_argument("--disable-dev-shm-usage")
+            minimal_options.add_argument("--disable-gpu")
+            driver = webdriver.Chrome(options=minimal_options)
+            logger.info("✅ Chrome initialized with system ChromeDriver (fallback)")
+        except Exception as fallback_error:
+            logger.error("❌ System ChromeDriver also failed: %s", fallback_error)
+            raise Exception(f"All ChromeDriver methods failed: {driver_error}, {fallback_error}")
+    if not driver:
+        raise Exception("Failed to initialize Chrome driver")
+    return driver
+
+def _selenium_fetch(url: str) -> str:
+    """
+    Render a page with headless Chrome and return its HTML.
+    Blocking - run it on _selenium_executor, off the event loop.
+    """
+    try:
+        driver, uses = _driver_pool.get_nowait()
+    except queue.Empty:
+        driver, uses = _create_chrome_driver(), 0
     
-    if not html:
-        return ScrapeResult(
-            text="Failed to fetch website content",
-            results="[]"
-        )
+    try:
+        driver.get(url)
+        html = driver.page_source
+    except Exception:
+        # Don't hand a possibly broken browser back to the pool
+        driver.quit()
+        raise
     
-    # Step 2: Analyze content to collect relevant links
-    if update_progress_callback:
-        update_progress_callback("analyzing", "🔍 Analyzing content for relevant links...")
-        
-    analysis_prompt = f"""
-    User Request: {question}
-    Website URL: {url}
-    Website Content: {html}
+    uses += 1
+    if uses >= _DRIVER_MAX_USES:
+        # Recycle long-lived browsers before Chrome's memory creep adds up
+        logger.debug("♻️ Retiring Chrome driver after %d page loads", uses)
+        driver.quit()
+        return html
     
+    try:
+        # Next scrape starts without this site's session state
+        driver.delete_all_cookies()
+        _driver_pool.put_nowait((driver, uses))
+    except Exception:
+        driver.quit()
+    return html
+
+def _drain_driver_pool():
+    """Quit any idle Chrome instances left in the pool"""
+    while True:
+        try:
+            driver, _ = _driver_pool.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+atexit.register(_drain_driver_pool)
+
+def _normalize_link(link: str) -> str:
+    """
+    Dedup key for a link: lower-case scheme/host and sorted query params. Plain
+    fragments are dropped, but hash routes ("#/jobs/1", "#!/job/3") name distinct pages
+    and are kept.
+    """
+    p = urlparse(link.strip())
+    query = urlencode(sorted(parse_qsl(p.query, keep_blank_values=True))) if p.query else ""
+    fragment = p.fragment if p.fragment.startswith(('/', '!')) else ""
+    return urlunparse(p._replace(scheme=p.scheme.lower(), netloc=p.netloc.lower(), query=query, fragment=fragment))
+
+def _dedupe_links(links: List[str]) -> List[str]:
+    """
+    Drop repeats (compared by their _normalize_link key) and skip-listed pages
+    (login, cart, legal...), keeping the first-seen link as written and in order.
+    "-" placeholders are always kept.
+    """
+    unique_links = []
+    seen = set()
+    for link in links:
+        if link == "-":
+            unique_links.append(link)
+            continue
+        key = _normalize_link(link)
+        if key in seen or _SKIP_LINK_PATH_RE.search(urlparse(key).path):
+            continue
+        seen.add(key)
+        unique_links.append(link)
+    return unique_links
+
+def _search_cache_key(link: str, question: str) -> bytes:
+    """Compact cache key for one link searched for one (normalised) question"""
+    return hashlib.blake2b(f"{link}|{question.strip().lower()}".encode(), digest_size=16).digest()
+
+def _scrape_cache_key(url: str, question: str) -> str:
+    """Stable cache key for a (url, question) scrape"""
+    return hashlib.sha1(f"{url.strip()}|{question.strip().lower()}".encode()).hexdigest()
+
+def _url_lock(url: str) -> asyncio.Lock:
+    """Return the lock serializing fetches of `url` (created on demand, freed when unused)"""
+    lock = _url_locks.get(url)
+    if lock is None:
+        lock = asyncio.Lock()
+        _url_locks[url] = lock
+    return lock
+
+async def _fetch_html(url: str) -> Optional[str]:
+    """
+    GET a page over HTTP. A copy seen before is revalidated with
+    If-None-Match / If-Modified-Since and reused on 304. Returns None on 404.
+    """
+    request_headers = {}
+    previous = _html_validators.get(url)
+    if previous:
+        if previous["etag"]:
+            request_headers["If-None-Match"] = previous["etag"]
+        if previous["last_modified"]:
+            request_headers["If-Modified-Since"] = previous["last_modified"]
+    
+    response = await _http_client.get(url, headers=request_headers)
+    
+    if response.status_code == 404:
+        return None
+    if response.status_code == 304 and previous:
+        logger.debug("♻️ Not modified since last fetch: %s", url)
+        return previous["html"]
+    response.raise_for_status()  # throws if status != 200
+    
+    html = response.text
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        _html_validators[url] = {"html": html, "etag": etag, "last_modified": last_modified}
+    return html
+
+def _browser_can_help(error: Exception) -> bool:
+    """
+    Whether a failed HTTP fetch is worth retrying in headless Chrome. Bot walls
+    (403/429) and server errors may render in a real browser; other 4xx answers
+    (410 Gone, 401, ...) come back the same, so the browser launch is skipped.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status in (403, 429) or status >= 500
+    return True
+
+def _join_root_relative(base_url: str, path: str) -> str:
+    """
+    Join a root-relative ("/x") or protocol-relative ("//host/x") path onto a
+    "scheme://netloc" base with plain string ops; urljoin re-parses the base
+    on every call, which adds up over hundreds of links.
+    """
+    if path.startswith('//'):
+        return base_url[:base_url.index(':') + 1] + path
+    return base_url + path
+
+async def close_http_clients():
+    """Close the pooled page-fetch and OpenAI HTTP clients (call once on shutdown)"""
+    await _http_client.aclose()
+    await client.close()
+
+def _iter_hrefs(html: str):
+    """Yield every <a href> value in document order (a single C-level parse via selectolax)"""
+    for node in LexborHTMLParser(html).css('a[href]'):
+        href = node.attributes.get('href')
+        if href:
+            yield href.strip()
+
+def _distill_page(html: str) -> str:
+    """
+    Compress a page for the link-selection prompt: title, headings, one
+    "- anchor text | href" line per link and the visible text (scripts and
+    styles dropped), instead of the raw markup
+    """
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(['script', 'style', 'noscript', 'svg'])
+    
+    parts = []
+    title = tree.css_first('title')
+    if title is not None:
+        parts.append(f"Page title: {title.text(strip=True)}\n")
+    
+    headings = [h.text(strip=True) for h in tree.css('h1, h2')]
+    if headings:
+        parts.append("Headings:\n")
+        parts.extend(f"- {h}\n" for h in headings if h)
+    
+    parts.append("Links (anchor text | href):\n")
+    for node in tree.css('a[href]')[:_MAX_PROMPT_ANCHORS]:
+        href = (node.attributes.get('href') or '').strip()
+        if href and not href.startswith(('#', 'javascript:')):
+            parts.append(f"- {node.text(strip=True)[:120]} | {href}\n")
+    
+    body = tree.body
+    if body is not None:
+        page_text = body.text(separator='\n', strip=True)
+        parts.append("Page text:\n")
+        parts.append(page_text[:_MAX_PROMPT_TEXT_CHARS])
+        if len(page_text) > _MAX_PROMPT_TEXT_CHARS:
+            parts.append("\n[page text truncated]")
+    return "".join(parts)
+
+def _iter_job_links(html: str, base_url: str):
+    """
+    Yield absolute job-detail URLs from the page's anchors in one parse:
+    relative /jobs/... paths are joined onto base_url, absolute URLs are kept
+    when they mention "jobs".
+    """
+    for href in _iter_hrefs(html):
+        if not _JOB_HREF_RE.match(href):
+            continue
+        if href[0] == '/':
+            # Relative job links like /jobs/registrar/... - convert to absolute
+            yield _join_root_relative(base_url, href)
+        else:
+            yield href  # Absolute job links
+
+def _heuristic_job_links(html: str, url: str, base_url: str) -> List[str]:
+    """
+    Job-detail links trusted without the link analyzer: same-host /jobs links,
+    minus the page itself and its query variants (pagination, filters), bare
+    /jobs listings and category/search navigation. Off-site "jobs" URLs are left
+    to the analyzer, since every link returned here costs a paid search.
+    """
+    page = urlparse(url)
+    host = page.netloc.lower().removeprefix('www.')
+    page_path = page.path.rstrip('/').lower()
+    links = {}
+    for link in _iter_job_links(html, base_url):
+        p = urlparse(link)
+        path = p.path.rstrip('/').lower()
+        if (p.netloc.lower().removeprefix('www.') != host
+                or path in (page_path, '/jobs')
+                or _JOB_NAV_PATH_RE.search(path)):
+            continue
+        links.setdefault(_normalize_link(link), link)
+    return list(links.values())
+
+# Static link-selection instructions, sent ahead of the per-page details so the
+# identical prefix is reused by OpenAI's prompt caching across scrapes
+_ANALYSIS_INSTRUCTIONS = """
     INTELLIGENT LINK SELECTION ANALYSIS:
     
     STEP 1 - ANALYZE USER INTENT:
-    First, analyze what the user is specifically asking for in their request: "{question}"
+    First, analyze what the user is specifically asking for in the User Request given at the end.
     
     Determine:
     - What TYPE of information do they want? (job details, doctor profiles, company info, contact details, etc.)
@@ -686,7 +1561,7 @@ async def scrape_data_bs(url: str, question: str, update_progress_callback=None)
     
     STEP 3 - SELECTIVE LINK COLLECTION:
     Only collect links that DIRECTLY serve the user's specific information need:
-    - Scan HTML content for links matching the identified intent
+    - Scan the page's links for ones matching the identified intent
     - Focus on links with relevant anchor text, URLs, or context
     - Prioritize links that would contain the exact information requested
     - Skip links that don't match the user's specific request type
@@ -700,100 +1575,182 @@ async def scrape_data_bs(url: str, question: str, update_progress_callback=None)
     IMPORTANT: Be SELECTIVE and intelligent. Collect only the MOST RELEVANT links that directly answer the user's specific question. Quality and relevance are more important than quantity.
     
     Return a summary explaining what type of links were selected based on the user's intent, and format the selected links as a JSON string array in the "results" field.
+"""
+
+async def _select_links_with_analyzer(url: str, question: str, html: str) -> ScrapeResult:
+    """Ask the content analyzer which of the page's links serve the question (results: JSON string array)"""
+    page_content = _distill_page(html)
+    logger.debug("🧹 Distilled page for analysis: %d -> %d chars", len(html), len(page_content))
+    
+    analysis_prompt = f"""{_ANALYSIS_INSTRUCTIONS}
+    User Request: {question}
+    Website URL: {url}
+    Website Content (distilled from the page HTML):
+{page_content}
     """
     
-    # Create a session for the analysis
-    temp_session = SQLiteSession("analysis_session", "analysis_temp.db")
+    # One-shot call: a fresh session would start empty and be discarded, so skip it
+    # entirely (no SQLite connection or writes, and no shared history between scrapes)
+    analysis_result = await Runner.run(content_analyzer_agent, analysis_prompt)
     
-    # Run the content analyzer
-    analysis_result = await Runner.run(
-        content_analyzer_agent,
-        analysis_prompt,
-        session=temp_session
+    # The agent's output_type already yields a ScrapeResult; check the type directly
+    # instead of relying on final_output_as(), which only casts and never raises here
+    analysis_data = analysis_result.final_output
+    if isinstance(analysis_data, ScrapeResult):
+        logger.debug("🔍 Link collection analysis: %.200s...", analysis_data.text)
+        return analysis_data
+    logger.warning("⚠️ Analysis parsing error: unexpected output type %s", type(analysis_data).__name__)
+    # Create a fallback result
+    return ScrapeResult(
+        text="Failed to parse analysis result - using fallback",
+        results="[]"
     )
+
+async def scrape_data_bs(url: str, question: str, update_progress_callback=None, use_batch: Optional[bool] = None, force_rescrape: bool = False) -> ScrapeResult:
+    """
+    Enhanced scraping with link collection and OpenAI search workflow.
+    Results are cached per (url, question) for an hour unless `force_rescrape` is set.
+    """
+    cache_key = _scrape_cache_key(url, question)
+    if not force_rescrape:
+        cached_result = _scrape_cache.get(cache_key)
+        if cached_result is not None:
+            logger.info("♻️ Using cached scrape result for: %s", url)
+            return cached_result
     
-    try:
-        analysis_data = analysis_result.final_output_as(ScrapeResult)
-        print(f"🔍 Link collection analysis: {analysis_data.text[:200]}...")
-        
-        # Extract collected links from the results field
-        results_text = str(analysis_data.results) if analysis_data.results else ""
-        
-    except Exception as analysis_error:
-        print(f"⚠️ Analysis parsing error: {analysis_error}")
-        # Create a fallback result
-        analysis_data = ScrapeResult(
-            text="Failed to parse analysis result - using fallback",
+    # Step 1: Fetch website content (concurrent scrapes of the same URL share one fetch)
+    async with _url_lock(url):
+        html = None if force_rescrape else _html_cache.get(url)
+        if html is not None:
+            logger.info("♻️ Using cached content for: %s", url)
+        else:
+            try:
+                logger.info("🌐 Fetching content from: %s", url)
+                if update_progress_callback:
+                    update_progress_callback("fetching", f"🌐 Fetching content from: {url[:50]}...")
+                    
+                async with _page_semaphore:
+                    html = await _fetch_html(url)
+                if html is None:
+                    # Past the last page - nothing for Selenium or the LLM to find here
+                    logger.info("⏹️ Page not found (404): %s", url)
+                    return ScrapeResult(
+                        text=f"Page not found: {url}",
+                        results="[]"
+                    )
+                logger.debug("✅ Successfully fetched with httpx (length: %d)", len(html))
+            except Exception as e:
+                if not _browser_can_help(e):
+                    logger.warning("❌ Request failed: %s", e)
+                    return ScrapeResult(
+                        text=f"Failed to scrape the website: {e}",
+                        results="[]"
+                    )
+                logger.warning("❌ Request failed: %s. Trying with Selenium...", e)
+                try:
+                    async with _page_semaphore:
+                        html = await asyncio.get_running_loop().run_in_executor(
+                            _selenium_executor, _selenium_fetch, url
+                        )
+                    logger.info("✅ Successfully fetched with Selenium (length: %d)", len(html))
+                except Exception as selenium_error:
+                    logger.error("❌ Selenium also failed: %s", selenium_error)
+                    return ScrapeResult(
+                        text="Failed to scrape the website - both the HTTP fetch and Selenium failed",
+                        results="[]"
+                    )
+            
+            if html:
+                _html_cache[url] = html
+    
+    if not html:
+        return ScrapeResult(
+            text="Failed to fetch website content",
             results="[]"
         )
-        results_text = ""
-        
-    # Step 3: Extract links from the analysis results
-    print("📋 Proceeding to link-based extraction using OpenAI search...")
-    
-    links = []
-    import re
-    from urllib.parse import urljoin, urlparse
     
     # Get base URL for converting relative links to absolute
     parsed_url = urlparse(url)
     base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
     
+    # Step 2: Collect relevant links. Job questions on listing pages that already
+    # expose plenty of job-detail anchors don't need the LLM to pick them out.
+    heuristic_links = []
+    if _JOB_QUESTION_RE.search(question):
+        heuristic_links = _heuristic_job_links(html, url, base_url)
+    
+    if len(heuristic_links) >= _HEURISTIC_LINKS_THRESHOLD:
+        logger.info("⚡ Found %d job links in the page's anchors - skipping the content analyzer", len(heuristic_links))
+        analysis_data = ScrapeResult(
+            text=f"Selected {len(heuristic_links)} job detail links directly from the page",
+            results=_dumps(heuristic_links)
+        )
+    else:
+        if update_progress_callback:
+            update_progress_callback("analyzing", "🔍 Analyzing content for relevant links...")
+        analysis_data = await _select_links_with_analyzer(url, question, html)
+    
+    # Extract collected links from the results field
+    results_text = str(analysis_data.results) if analysis_data.results else ""
+        
+    # Step 3: Extract links from the analysis results
+    logger.debug("📋 Proceeding to link-based extraction using OpenAI search...")
+    
+    links = []
+    # Set mirror of the real URLs in `links` so every source below dedups in O(1)
+    seen_links = set()
+    
     # Try to parse links from JSON results first
     try:
-        import json
-        if analysis_data.results and analysis_data.results != "[]":
-            parsed_links = json.loads(analysis_data.results)
-            if isinstance(parsed_links, list):
-                for link in parsed_links:
-                    if isinstance(link, str):
-                        if link == '-':
-                            links.append(link)  # Keep "-" placeholders
-                        elif link.startswith('http'):
-                            links.append(link)  # Already absolute URL
-                        elif link.startswith('/'):
-                            # Convert relative URL to absolute
-                            full_url = urljoin(base_url, link)
-                            links.append(full_url)
+        parsed_links = _maybe_list(analysis_data.results)
+        if isinstance(parsed_links, list):
+            for link in parsed_links:
+                if isinstance(link, str):
+                    if link == '-':
+                        links.append(link)  # Keep every "-" placeholder (they hold list positions)
+                        continue
+                    if link.startswith('http'):
+                        full_url = link  # Already absolute URL
+                    elif link.startswith('/'):
+                        # Convert relative URL to absolute
+                        full_url = _join_root_relative(base_url, link)
+                    else:
+                        continue
+                    if full_url not in seen_links:
+                        seen_links.add(full_url)
+                        links.append(full_url)
     except json.JSONDecodeError:
         pass
     
     # CRITICAL: Extract URLs from HTML directly as fallback (for medrecruit-style job links)
-    if not links or len(links) < 5:  # If we found few links, try direct HTML extraction
-        print("🔍 Few links found from analysis, trying direct HTML extraction...")
-        
-        # Look specifically for job detail links in the HTML
-        job_link_patterns = [
-            r'href="(/jobs/[^"]+)"',  # Relative job links like /jobs/registrar/...
-            r'href="(https?://[^"]*jobs[^"]*)"',  # Absolute job links
-        ]
+    if len(links) < _MIN_LINKS_TARGET:  # If we found few links, try direct HTML extraction
+        logger.debug("🔍 Few links found from analysis, trying direct HTML extraction...")
         
-        for pattern in job_link_patterns:
-            matches = re.findall(pattern, html, re.IGNORECASE)
-            for match in matches:
-                if match.startswith('/'):
-                    # Convert relative to absolute
-                    full_url = urljoin(base_url, match)
-                    if full_url not in links:
-                        links.append(full_url)
-                elif match.startswith('http') and match not in links:
-                    links.append(match)
+        # Look specifically for job detail links in the page's anchors
+        links_before = len(links)
+        for job_link in _iter_job_links(html, base_url):
+            if job_link not in seen_links:
+                seen_links.add(job_link)
+                links.append(job_link)
         
-        print(f"🔍 Direct HTML extraction found {len(links)} additional job links")
+        logger.debug("🔍 Direct HTML extraction found %d additional job links", len(links) - links_before)
     
-    # Also extract URLs from text fields as additional fallback
-    combined_text = f"{analysis_data.text} {results_text}"
-    url_pattern = r'https?://[^\s<>"]{2,}'
-    found_urls = re.findall(url_pattern, combined_text)
-    
-    # Clean and deduplicate URLs
-    for url_found in found_urls:
-        clean_url = url_found.rstrip('.,;:')  # Remove trailing punctuation
-        if clean_url not in links and len(clean_url) > 10:
-            links.append(clean_url)
+    # Also extract URLs from text fields as additional fallback, only while still short of links
+    if len(links) < _MIN_LINKS_TARGET:
+        found_urls = itertools.chain(
+            _URL_IN_TEXT_RE.finditer(analysis_data.text),
+            _URL_IN_TEXT_RE.finditer(results_text)
+        )
+        
+        # Clean and deduplicate URLs
+        for url_match in found_urls:
+            clean_url = url_match.group(0).rstrip('.,;:')  # Remove trailing punctuation
+            if clean_url not in seen_links and len(clean_url) > 10:
+                seen_links.add(clean_url)
+                links.append(clean_url)
     
     # Process all found links without limiting
-    print(f"🔗 Processing all {len(links)} links found (no limit applied)")
+    logger.debug("🔗 Processing all %d links found (no limit applied)", len(links))
     
     if not links:
         return ScrapeResult(
@@ -801,13 +1758,15 @@ async def scrape_data_bs(url: str, question: str, update_progress_callback=None)
             results="[]"
         )
     
-    print(f"🔗 Found {len(links)} links to search")
+    logger.info("🔗 Found %d links to search", len(links))
     
     # Step 4: Search through links using OpenAI
     if update_progress_callback:
         update_progress_callback("searching", f"🔍 Searching {len(links)} links with OpenAI...")
         
-    search_results = await search_links_with_openai(links, question, update_progress_callback)
+    search_results = await search_links_with_openai(
+        links, question, update_progress_callback, use_batch=use_batch, force_rescrape=force_rescrape
+    )
     
     # Step 5: Combine and format the search results
     combined_results = []
@@ -823,68 +1782,115 @@ async def scrape_data_bs(url: str, question: str, update_progress_callback=None)
             combined_results.append(result)
     
     if combined_results:
-        import json
-        return ScrapeResult(
-            text=f"Successfully searched {len(links)} links and found relevant information in {successful_results} of them related to: {question}",
-            results=json.dumps(combined_results)
+        scrape_result = ScrapeResult(
+            text=f"Successfully searched {len(search_results)} links and found relevant information in {successful_results} of them related to: {question}",
+            results=_dumps(combined_results)
         )
+        if successful_results:
+            _scrape_cache[cache_key] = scrape_result
+        return scrape_result
     else:
         return ScrapeResult(
-            text=f"Searched {len(links)} links but no relevant information found for: {question}",
+            text=f"Searched {len(search_results)} links but no relevant information found for: {question}",
             results="[]"
         )
 
+@functools.lru_cache(maxsize=256)
+def _page_url_builder(url: str):
+    """
+    Parse `url` once and return make(page) -> url with `page=...` set; only the
+    page number changes between calls, the rest of the query is pre-encoded.
+    """
+    p = urlparse(url)
+    pairs = parse_qsl(p.query, keep_blank_values=True)
+    # An existing page param keeps its position; otherwise it goes last
+    split = next((i for i, (k, _) in enumerate(pairs) if k == "page"), len(pairs))
+    head = urlencode([kv for kv in pairs[:split] if kv[0] != "page"])
+    tail = urlencode([kv for kv in pairs[split:] if kv[0] != "page"])
+    head = head + "&" if head else ""
+    tail = "&" + tail if tail else ""
+    
+    def make(page: int) -> str:
+        return urlunparse(p._replace(query=f"{head}page={page}{tail}"))
+    return make
+
 def update_url_page(url: str, page: int) -> str:
     """
     Given a URL with a `page` query param (or without), returns a new URL
     with `page=...` set to the desired value.
     """
-    p = urlparse(url)
-    qs = parse_qs(p.query)
-    qs["page"] = [str(page)]
-    new_query = urlencode(qs, doseq=True)
-    return urlunparse(p._replace(query=new_query))
+    return _page_url_builder(url)(page)
 
+@functools.lru_cache(maxsize=256)
 def extract_page_range(question: str):
     """
     Look for patterns like 'page X until Y' or 'pages X to Y' in the question.
     Returns (start, end) as ints, or None if not found.
     """
-    # Try different patterns for page ranges
-    patterns = [
-        r"page(?:s)?\s*(\d+)\s*(?:to|until|-)\s*(\d+)",  # "pages 1 to 5", "page 1-3"
-        r"page\s+(\d+)\s+to\s+page\s+(\d+)",             # "page 1 to page 10"
-        r"from\s+page\s*(\d+)\s*(?:to|until|-)\s*(?:page\s*)?(\d+)"  # "from page 1 to 5"
-    ]
-    
-    for pattern in patterns:
-        m = re.search(pattern, question, re.IGNORECASE)
+    # Every pattern needs the word "page", so most questions never reach the regexes
+    if 'page' not in question.lower():
+        return None
+    for pattern in _PAGE_RANGE_PATTERNS:
+        m = pattern.search(question)
         if m:
             return int(m.group(1)), int(m.group(2))
     return None
 
-async def flexible_scrape(url: str, question: str, update_progress_callback=None) -> ScrapeResult:
+async def flexible_scrape(url: str, question: str, update_progress_callback=None, use_batch: Optional[bool] = None, force_rescrape: bool = False, page_range=None) -> ScrapeResult:
     """
-    If `question` specifies a page range, loops from start→end; otherwise
-    scrapes just the single `url`. Returns a ScrapeResult object.
+    If `question` specifies a page range, loops from start→end (stopping early
+    after two consecutive empty pages); otherwise scrapes just the single `url`.
+    Callers that already ran extract_page_range can pass its result as `page_range`.
+    Returns a ScrapeResult object.
     """
-    pr = extract_page_range(question)
-    if pr:
-        start, end = pr
-        urls = [update_url_page(url, p) for p in range(start, end + 1)]
-        print(f"📄 Multi-page scraping detected: pages {start} to {end} ({len(urls)} pages)")
-    else:
-        urls = [url]
-        print(f"📄 Single page scraping: {url}")
+    pr = page_range if page_range is not None else extract_page_range(question)
+    if not pr:
+        # Common case: one page, no batching, early-stop bookkeeping or combine step
+        logger.info("📄 Single page scraping: %s", url)
+        return await scrape_data_bs(
+            url, question, update_progress_callback, use_batch=use_batch, force_rescrape=force_rescrape
+        )
+    
+    start, end = pr
+    make_url = _page_url_builder(url)
+    urls = [make_url(p) for p in range(start, end + 1)]
+    logger.info("📄 Multi-page scraping detected: pages %d to %d (%d pages)", start, end, len(urls))
 
     per_page_outputs = []
     total_pages = len(urls)
     
-    for i, u in enumerate(urls, 1):
+    async def scrape_page(i: int, u: str) -> ScrapeResult:
         if update_progress_callback:
             update_progress_callback("scraping", f"🌐 Scraping page {i}/{total_pages}: {u[:50]}...")
-        print(f"Scraping {u} ({i}/{total_pages})...")
-        per_page_outputs.append(await scrape_data_bs(u, question, update_progress_callback))
+        logger.debug("Scraping %s (%d/%d)...", u, i, total_pages)
+        try:
+            page_result = await scrape_data_bs(
+                u, question, update_progress_callback, use_batch=use_batch, force_rescrape=force_rescrape
+            )
+        except Exception as page_error:
+            # One failing page shouldn't abort the rest of the range
+            logger.warning("❌ Page %d/%d failed: %s", i, total_pages, page_error)
+            page_result = ScrapeResult(
+                text=f"Failed to scrape page {i}: {str(page_error)}",
+                results="[]"
+            )
+        if update_progress_callback:
+            update_progress_callback("scraping", f"✅ Page {i}/{total_pages} done")
+        return page_result
+    
+    # Scrape pages in small parallel batches so we can stop early once the
+    # site runs out of pages (e.g. user asked for 1-50 but only 12 exist)
+    for batch_start in range(0, total_pages, _PAGE_BATCH_SIZE):
+        batch = urls[batch_start:batch_start + _PAGE_BATCH_SIZE]
+        per_page_outputs.extend(await asyncio.gather(
+            *(scrape_page(i, u) for i, u in enumerate(batch, batch_start + 1))
+        ))
+        
+        if len(per_page_outputs) >= 2 and all(
+            not sr.results or sr.results == "[]" for sr in per_page_outputs[-2:]
+        ):
+            logger.info("⏹️ Two consecutive empty pages - stopping after page %d/%d", len(per_page_outputs), total_pages)
+            break
 
     # if only one page, just return it
     if len(per_page_outputs) == 1:
@@ -892,62 +1898,69 @@ async def flexible_scrape(url: str, question: str, update_progress_callback=None
 
     # otherwise, combine them into one ScrapeResult
     if update_progress_callback:
-        update_progress_callback("analyzing", f"🧠 Combining data from {total_pages} pages...")
+        update_progress_callback("analyzing", f"🧠 Combining data from {len(per_page_outputs)} pages...")
     combined = await combine_results(per_page_outputs)
     return combined
 
+# Per-page cap for the summaries quoted in the combined text
+_MAX_COMBINED_SUMMARY_CHARS = 500
+
 async def combine_results(scrape_results: List[ScrapeResult]) -> ScrapeResult:
     """
     Takes multiple ScrapeResult objects and combines them into one ScrapeResult.
     """
-    print(f"🔄 Combining results from {len(scrape_results)} pages...")
+    logger.info("🔄 Combining results from %d pages...", len(scrape_results))
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
     
-    # Debug: Show what data we're starting with
-    for i, sr in enumerate(scrape_results, 1):
-        print(f"📄 Page {i} summary: {sr.text[:100]}...")
-        if sr.results and sr.results != "[]":
-            try:
-                import json
-                parsed = json.loads(sr.results)
-                print(f"📊 Page {i} has {len(parsed)} items")
-                # Show first item as sample
-                if parsed and len(parsed) > 0:
-                    first_item = parsed[0]
-                    if isinstance(first_item, dict):
-                        sample_data = first_item.get("extracted_data", first_item)
-                        print(f"📋 Page {i} sample: {str(sample_data)[:200]}...")
-            except:
-                print(f"⚠️ Page {i} results parsing failed")
-    
-    # Directly combine the results without using content analyzer (which might be generating dummy data)
-    combined_text_parts = []
+    # Directly combine the results without using content analyzer (which might be generating dummy data);
+    # each page's results are parsed exactly once
     combined_results_parts = []
     
-    for sr in scrape_results:
-        combined_text_parts.append(sr.text)
-        if sr.results and sr.results != "[]":
-            try:
-                import json
-                parsed_results = json.loads(sr.results)
-                if isinstance(parsed_results, list):
-                    # Add all results directly - don't process through content analyzer
-                    combined_results_parts.extend(parsed_results)
-                else:
-                    combined_results_parts.append(parsed_results)
-            except json.JSONDecodeError as e:
-                print(f"❌ JSON parsing error in combine_results: {e}")
-                # If parsing fails, treat as raw text
-                combined_results_parts.append({"extracted_data": {"content": sr.results}, "source_url": "unknown", "summary": "Raw data from parsing error"})
+    for i, sr in enumerate(scrape_results, 1):
+        if debug_enabled:
+            logger.debug("📄 Page %d summary: %.100s...", i, sr.text)
+        try:
+            parsed_results = _maybe_list(sr.results)
+        except json.JSONDecodeError as e:
+            logger.warning("❌ JSON parsing error in combine_results: %s", e)
+            parsed_results = None
+        if parsed_results is None:
+            # Not JSON - treat as raw text
+            logger.debug("⚠️ Page %d results parsing failed", i)
+            combined_results_parts.append({"extracted_data": {"content": sr.results}, "source_url": "unknown", "summary": "Raw data from parsing error"})
+        elif isinstance(parsed_results, list):
+            if debug_enabled and parsed_results:
+                logger.debug("📊 Page %d has %d items", i, len(parsed_results))
+                first_item = parsed_results[0]
+                if isinstance(first_item, dict):
+                    # Show first item as sample
+                    logger.debug("📋 Page %d sample: %.200s...", i, first_item.get("extracted_data", first_item))
+            # Add all results directly - don't process through content analyzer
+            combined_results_parts.extend(parsed_results)
+        else:
+            combined_results_parts.append(parsed_results)
     
-    print(f"🎯 Direct combination completed: {len(combined_results_parts)} total items")
+    logger.info("🎯 Direct combination completed: %d total items", len(combined_results_parts))
     
     # Return combined results directly without using content analyzer agent
-    import json
     return ScrapeResult(
-        text=f"Combined {len(combined_results_parts)} items from {len(scrape_results)} pages",
-        results=json.dumps(combined_results_parts)
+        text=f"Combined {len(combined_results_parts)} items from {len(scrape_results)} pages across: "
+             + "; ".join(sr.text[:_MAX_COMBINED_SUMMARY_CHARS] for sr in scrape_results[:5]),
+        results=_dumps(combined_results_parts)
     )
 
+# Pretty-print extracted data in chat responses (the bundled UI shows it verbatim);
+# set to false to send the compact JSON as-is
+_PRETTY_JSON_RESPONSES = os.getenv("PRETTY_JSON_RESPONSES", "true").lower() in ("1", "true", "yes")
+
+# Bounded repr for result previews: large items are truncated while formatting,
+# not stringified in full and then sliced
+_preview_repr = reprlib.Repr()
+_preview_repr.maxlevel = 2
+_preview_repr.maxdict = 4
+_preview_repr.maxstring = 60
+_preview_repr.maxother = 60
+
 # Main workflow orchestrator with session support and progress tracking
 async def process_user_request(user_input: str, session: SQLiteSession):
     """Main workflow that classifies and routes user requests with session memory and progress tracking"""
@@ -963,15 +1976,11 @@ async def process_user_request(user_input: str, session: SQLiteSession):
             completed=completed
         )
         progress_store[session_id] = progress_update
-        print(f"🔄 Progress Update: {step} - {description} [Session: {session_id}]")
-        print(f"📤 Progress stored in progress_store for session: {session_id}")
-        print(f"📊 Current progress_store keys: {list(progress_store.keys())}")
+        logger.debug("🔄 Progress %s - %s [Session: %s]", step, description, session_id)
     
-    print("🤖 Multi-Agent Request Processor with Session Memory")
-    print("=" * 60)
-    print(f"📝 User Input: {user_input}")
-    print(f"🔗 Session ID: {session.session_id}")
-    print("=" * 60)
+    logger.info("📝 User Input: %s [Session: %s]", user_input, session_id)
+    # The classifier and follow-up context read the history, so the previous turn must be stored
+    await flush_history_writes(session_id)
     
     try:
         # Step 1: Initialize processing
@@ -979,22 +1988,30 @@ async def process_user_request(user_input: str, session: SQLiteSession):
         
         # Step 2: Classify the request (with session context)
         update_progress("analyzing", "🔍 Analyzing the type of question...")
-        print("Step 1: Classifying request type...")
         
-        classification_result = await Runner.run(
-            request_classifier_agent, 
-            user_input,
-            session=session  # Session provides conversation context
-        )
-        classification = classification_result.final_output_as(RequestClassification)
+        cache_key = (session_id, " ".join(user_input.lower().split()))
+        classification = _classification_cache.get(cache_key)
+        if classification is None:
+            classification_result = await Runner.run(
+                request_classifier_agent, 
+                user_input,
+                session=session  # Session provides conversation context
+            )
+            classification = classification_result.final_output_as(RequestClassification)
+            if _is_context_free(classification, user_input):
+                _classification_cache[cache_key] = classification
+        else:
+            # Skipping the classifier run must not drop the user's turn from the history
+            await session.add_items([{"role": "user", "content": user_input}])
+            logger.debug("♻️ Reusing cached classification for session %s", session_id)
         
-        print(f"🔍 Classification: {classification.request_type}")
-        print(f"💭 Reasoning: {classification.reasoning}")
+        logger.info("🔍 Classification: %s", classification.request_type)
+        logger.debug("💭 Reasoning: %s", classification.reasoning)
         
         # Step 3: Route to appropriate agent (with session context)
         if classification.request_type == "regular_question":
             update_progress("processing", "📚 Generating answer to your question...")
-            print("\n📚 Routing to Regular Q&A Agent...")
+            logger.debug("📚 Routing to Regular Q&A Agent...")
             
             # Get scraped data context for follow-up questions
             scraped_context = await get_scraped_data_context(session)
@@ -1018,18 +2035,10 @@ async def process_user_request(user_input: str, session: SQLiteSession):
             
             update_progress("finalizing", "✅ Preparing response...")
             
-            print("\n" + "=" * 60)
-            print("🎯 REGULAR Q&A RESULT:")
-            print(f"Question: {user_input}")
-            print(f"Answer: {answer.answer}")
-            if answer.explanation:
-                print(f"Explanation: {answer.explanation}")
-            print("=" * 60)
+            logger.debug("🎯 Q&A answer: %.200s", answer.answer)
             
             # Format response for API
-            response_text = answer.answer
-            if answer.explanation:
-                response_text += f"\n\n{answer.explanation}"
+            response_text = f"{answer.answer}\n\n{answer.explanation}" if answer.explanation else answer.answer
             
             # Mark as completed
             update_progress("completed", "✅ Answer ready!", completed=True)
@@ -1042,14 +2051,14 @@ async def process_user_request(user_input: str, session: SQLiteSession):
             
         elif classification.request_type == "scrape_data":
             update_progress("processing", "🕷️ Preparing to scrape website...")
-            print("\n🕷️ Routing to Web Scraping Agent...")
+            logger.debug("🕷️ Routing to Web Scraping Agent...")
             
             # Extract URL and question
             url = classification.url
             question = classification.question or "Extract all relevant information from this website"
             
             if not url:
-                print("❌ No URL found in scraping request")
+                logger.warning("❌ No URL found in scraping request")
                 update_progress("error", "❌ No URL found in request", completed=True)
                 return {
                     "response": "Sorry, I need a URL to scrape data. Please provide a valid website URL.",
@@ -1064,17 +2073,15 @@ async def process_user_request(user_input: str, session: SQLiteSession):
             page_range = extract_page_range(question)
             if page_range:
                 start, end = page_range
-                print(f"📄 Multi-page scraping requested: pages {start} to {end}")
                 update_progress("scraping", f"🌐 Preparing to scrape {end - start + 1} pages...")
             else:
-                print(f"📄 Single page scraping: {url}")
                 update_progress("scraping", f"🌐 Scraping data from {url[:50]}...")
             
             # Use the new flexible scraping function with progress callback
             try:
-                scraped_data = await flexible_scrape(url, question, update_progress_callback=update_progress)
+                scraped_data = await flexible_scrape(url, question, update_progress_callback=update_progress, page_range=page_range)
             except Exception as scrape_error:
-                print(f"❌ Scraping failed: {scrape_error}")
+                logger.error("❌ Scraping failed: %s", scrape_error)
                 update_progress("error", "❌ Failed to scrape website", completed=True)
                 return {
                     "response": f"Failed to scrape website: {str(scrape_error)}",
@@ -1084,52 +2091,51 @@ async def process_user_request(user_input: str, session: SQLiteSession):
             
             update_progress("finalizing", "📋 Formatting extracted data...")
             
-            print("\n" + "=" * 60)
-            print("🕸️ WEB SCRAPING RESULT:")
-            print(f"URL: {url}")
-            print(f"Request: {question}")
-            print(f"Summary: {scraped_data.text}")
+            logger.info("🕸️ Scraped %s: %.200s", url, scraped_data.text)
             
-            if scraped_data.results and scraped_data.results != "[]":
-                try:
-                    import json
-                    parsed_results = json.loads(scraped_data.results)
-                    print(f"\nExtracted Results: {len(parsed_results)} items")
-                    for i, item in enumerate(parsed_results[:3], 1):  # Show first 3 items
-                        print(f"  {i}. {str(item)[:100]}...")
-                except json.JSONDecodeError as e:
-                    print(f"❌ JSON decode error: {e}")
-                    print(f"\nExtracted Results: Raw data")
-                    print(f"  {scraped_data.results[:200]}...")
-            else:
-                print("\nNo specific data extracted.")
+            # Parse the results once; reused for the log preview, the response and the context cache
+            try:
+                parsed_results = _maybe_list(scraped_data.results)
+            except json.JSONDecodeError as e:
+                logger.warning("❌ JSON decode error: %s", e)
+                parsed_results = None
             
-            print("=" * 60)
+            if logger.isEnabledFor(logging.DEBUG):
+                if parsed_results:
+                    logger.debug("Extracted Results: %d items", len(parsed_results))
+                    for i, item in enumerate(parsed_results[:3], 1):  # Show first 3 items
+                        logger.debug("  %d. %s", i, _preview_repr.repr(item))
+                elif parsed_results is None:
+                    logger.debug("Extracted Results: Raw data\n  %.200s...", scraped_data.results)
+                else:
+                    logger.debug("No specific data extracted.")
             
             # Format response for API in the requested JSON structure
             page_info = ""
-            page_range = extract_page_range(question)
             if page_range:
                 start, end = page_range
                 page_info = f" (Pages {start}-{end})"
             
-            # Format response for API (maintain consistent format with regular questions)
-            response_text = f"**Scraped from:** {url}{page_info}\n\n**Summary:** {scraped_data.text}"
-            if scraped_data.results and scraped_data.results != "[]":
-                try:
-                    import json
-                    parsed_results = json.loads(scraped_data.results)
-                    response_text += f"\n\n**Extracted Data:**\n{json.dumps(parsed_results, indent=2)}"
-                    print(f"✅ Successfully parsed {len(parsed_results)} results from {url}")
-                except json.JSONDecodeError as e:
-                    print(f"❌ JSON decode error: {e}")
-                    response_text += f"\n\n**Extracted Data:**\n{scraped_data.results}"
+            # Format response for API (maintain consistent format with regular questions).
+            # The history copy keeps the compact JSON the scrape produced (smaller rows, fewer
+            # replayed tokens); only the API response is pretty-printed, when enabled.
+            header = f"**Scraped from:** {url}{page_info}\n\n**Summary:** {scraped_data.text}"
+            last_scrape_results.pop(session_id, None)
+            if parsed_results:
+                # The raw results already are the JSON array, so follow-up questions reuse them without re-encoding
+                last_scrape_results[session_id] = scraped_data.results
+                logger.info("✅ Successfully parsed %d results from %s", len(parsed_results), url)
+            if parsed_results or parsed_results is None:
+                history_text = "".join((header, "\n\n**Extracted Data:**\n", scraped_data.results))
+            else:
+                history_text = header
+            if parsed_results and _PRETTY_JSON_RESPONSES:
+                response_text = "".join((header, "\n\n**Extracted Data:**\n", _dumps(parsed_results, indent=True)))
+            else:
+                response_text = history_text
             
-            # Store the scraped response in the session for future reference
-            await session.add_items([
-                {"role": "assistant", "content": response_text}
-            ])
-            print("✅ Stored scraped data in session for future reference")
+            # Store the scraped response in the session for future reference (off the response path)
+            _write_history_later(session, [{"role": "assistant", "content": history_text}])
             
             # Mark as completed
             update_progress("completed", "✅ Scraping complete!", completed=True)
@@ -1141,7 +2147,7 @@ async def process_user_request(user_input: str, session: SQLiteSession):
             }
             
         else:
-            print(f"❌ Unknown request type: {classification.request_type}")
+            logger.warning("❌ Unknown request type: %s", classification.request_type)
             update_progress("error", "❌ Unknown request type", completed=True)
             return {
                 "response": "Sorry, I couldn't understand your request type.",
@@ -1150,7 +2156,7 @@ async def process_user_request(user_input: str, session: SQLiteSession):
             }
             
     except Exception as e:
-        print(f"❌ Error in workflow: {e}")
+        logger.exception("❌ Error in workflow: %s", e)
         update_progress("error", f"❌ Error: {str(e)}", completed=True)
         return {
             "response": f"An error occurred: {str(e)}",
@@ -1158,12 +2164,42 @@ async def process_user_request(user_input: str, session: SQLiteSession):
             "success": False
         }
 
+async def _read_line(prompt: str) -> str:
+    """
+    input() on a daemon thread, so the event loop keeps running while we wait and
+    an abandoned read (Ctrl+C, shutdown) never holds up interpreter exit the way a
+    blocked executor thread would. EOF/KeyboardInterrupt are re-raised here.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def settle(result=None, error=None):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    
+    def read():
+        try:
+            outcome = (input(prompt), None)
+        except BaseException as e:
+            outcome = (None, e)
+        try:
+            loop.call_soon_threadsafe(settle, *outcome)
+        except RuntimeError:
+            pass  # loop already closed: nobody is waiting for this line any more
+    
+    threading.Thread(target=read, name="cli-input", daemon=True).start()
+    return await future
+
 # Interactive mode with persistent session (for CLI use)
 async def interactive_agent_with_session():
     """Interactive mode with session memory for follow-up questions"""
     
     # Create a persistent session
-    session = SQLiteSession("multi_agent_session", "conversation_history.db")
+    session = TunedSQLiteSession("multi_agent_session", "conversation_history.db")
     
     print("🤖" * 20)
     print("Multi-Agent Request Processor with Session Memory!")
@@ -1182,31 +2218,37 @@ async def interactive_agent_with_session():
     print("\nType 'exit' to quit")
     print("=" * 60)
     
-    while True:
-        try:
-            # Get user input
-            user_input = input("\n🎤 Your request: ").strip()
-            
-            if user_input.lower() in ['exit', 'quit', 'bye']:
-                print("👋 Thanks for using the Multi-Agent Processor! Your conversation is saved.")
+    try:
+        while True:
+            try:
+                user_input = (await _read_line("\n🎤 Your request: ")).strip()
+                
+                if user_input.lower() in ['exit', 'quit', 'bye']:
+                    print("👋 Thanks for using the Multi-Agent Processor! Your conversation is saved.")
+                    break
+                
+                if not user_input:
+                    print("Please enter a request!")
+                    continue
+                
+                # Process the request with session memory
+                result = await process_user_request(user_input, session)
+                print("\n" + result["response"])
+                
+            except (KeyboardInterrupt, EOFError, asyncio.CancelledError):
+                # Ctrl+C reaches us as a cancellation of the main task (asyncio.run's SIGINT handler)
+                print("\n👋 Thanks for using the Multi-Agent Processor! Your conversation is saved.")
                 break
-            
-            if not user_input:
-                print("Please enter a request!")
+            except Exception as e:
+                print(f"❌ Unexpected error: {e}")
                 continue
-            
-            # Process the request with session memory
-            result = await process_user_request(user_input, session)
-            
-        except KeyboardInterrupt:
-            print("\n👋 Thanks for using the Multi-Agent Processor! Your conversation is saved.")
-            break
-        except Exception as e:
-            print(f"❌ Unexpected error: {e}")
-            continue
+    finally:
+        # Make sure the last turn is on disk before the event loop shuts down
+        await flush_history_writes()
 
 async def main():
     """Main function to demonstrate the session-enabled workflow"""
+    configure_logging()
     
     # Run demo first
     #await demo_session_functionality()
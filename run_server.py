@@ -17,8 +17,11 @@ def main():
     try:
         # Run the FastAPI server using the api.py file
         from api import app
+        from main_agents import configure_logging
         import uvicorn
         
+        configure_logging()
+        
         print("✅ Starting server on http://localhost:8000")
         print("✅ Chat interface will be available at http://localhost:8000")
         print("Press Ctrl+C to stop the server")